@@ -1 +1,41 @@
+# ==========================================
+# 🧩 Agent Core: state and async behaviour
+# ==========================================
+import asyncio
+from dataclasses import dataclass
 
+@dataclass
+class AgentState:
+    name: str
+    memory: dict
+    status: str = "idle"
+
+# Initialize the agent
+agent = AgentState(name="KairosAgent", memory={})
+
+async def gather_information():
+    """Simulate data retrieval (API or DB call)."""
+    await asyncio.sleep(1)
+    return {"info": "data received"}
+
+async def process_input(user_input: str):
+    """Handle user input and prepare a response."""
+    data = await gather_information()
+    agent.memory["last_input"] = user_input
+    return f"Processed: {user_input} with {data['info']}"
+
+TOKEN_DELAY = 0.02  # simulated time to generate one token
+
+async def generate_tokens(text: str, token_delay: float = None):
+    """Simulate an LLM streaming `text` back token by token (a local fake LLM stream)."""
+    delay = TOKEN_DELAY if token_delay is None else token_delay
+    for i, word in enumerate(text.split(" ")):
+        await asyncio.sleep(delay)
+        yield word if i == 0 else " " + word
+
+async def stream_input(user_input: str):
+    """Like process_input, but yields the reply as it is generated."""
+    data = await gather_information()
+    agent.memory["last_input"] = user_input
+    async for token in generate_tokens(f"Processed: {user_input} with {data['info']}"):
+        yield token
@@ -2,28 +2,134 @@
 # ==========================================
 # 🚀 FastAPI Application for AI Agent
 # ==========================================
-from fastapi import FastAPI
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from agent_core import process_input, agent
+from agent_core import process_input, stream_input, agent
+from utils.api_utils import aclose_async_client
+from utils.scheduler import RequestScheduler, SchedulerSaturated
+from utils.serialization import NDJSON_MEDIA_TYPE, aiter_ndjson, dumps, wants_ndjson
+from utils.sse import SSE_HEADERS, SSE_MEDIA_TYPE, sse_stream
+
+# The sentiment classifier fine-tuned in Chapter 3 (models/custom_model_finetune.py),
+# which saves it to models/finetuned_model when run from the chapter's root.
+CHAPTER_3_MODELS = Path(__file__).resolve().parents[2] / "Chapter 3 — Machine Learning & NLP Fundamentals" / "models"
+sys.path.append(str(CHAPTER_3_MODELS))
+CLASSIFIER_DIR = os.environ.get("CLASSIFIER_MODEL_DIR", str(CHAPTER_3_MODELS / "finetuned_model"))
+CLASSIFIER_QUANTIZE = os.environ.get("CLASSIFIER_QUANTIZE", "0") == "1"
+SSE_HEARTBEAT = float(os.environ.get("AGENT_SSE_HEARTBEAT", "15"))
 
 # Define request model
 class Query(BaseModel):
     message: str
 
+class BatchQuery(BaseModel):
+    messages: list[str]
+
+class ClassifyRequest(BaseModel):
+    text: str
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by utils.serialization (orjson when installed).
+
+    Returning one directly from an endpoint also skips FastAPI's
+    jsonable_encoder pass, so the payload is encoded exactly once.
+    """
+    def render(self, content) -> bytes:
+        return dumps(content)
+
 # Initialize the FastAPI app
-app = FastAPI(title="Kairos AI Agent API", version="1.0")
+app = FastAPI(title="Kairos AI Agent API", version="1.0", default_response_class=FastJSONResponse)
+scheduler = RequestScheduler(
+    max_concurrency=int(os.environ.get("AGENT_MAX_CONCURRENCY", "64")),
+    max_queue=int(os.environ.get("AGENT_MAX_QUEUE", "256")),
+)
+classifier_batcher = None
+
+def get_classifier_batcher():
+    """Loads the classifier on first use; concurrent requests share its micro-batches."""
+    global classifier_batcher
+    if classifier_batcher is None:
+        from inference import MicroBatcher, SentimentClassifier
+        classifier = SentimentClassifier(CLASSIFIER_DIR, quantize=CLASSIFIER_QUANTIZE)
+        classifier_batcher = MicroBatcher(classifier)
+    return classifier_batcher
 
 @app.get("/status")
 def get_status():
-    """Returns the current state of the agent."""
-    return {"name": agent.name, "status": agent.status}
+    """Returns the current state of the agent and its request scheduler."""
+    stats = scheduler.stats()
+    status = "processing" if stats["in_flight"] or stats["queue_depth"] else "idle"
+    return {"name": agent.name, "status": status, **stats}
 
 @app.post("/respond")
 async def respond(query: Query):
-    """Processes a user query asynchronously."""
-    agent.status = "processing"
-    reply = await process_input(query.message)
-    agent.status = "idle"
-    return {"response": reply}
+    """Processes a user query asynchronously; answers 429 when the agent is saturated."""
+    try:
+        request_id, reply = await scheduler.submit(process_input, query.message)
+    except SchedulerSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    return FastJSONResponse({"request_id": request_id, "response": reply})
+
+@app.post("/respond/batch")
+async def respond_batch(batch: BatchQuery, request: Request):
+    """Processes several queries; streams one NDJSON line per reply if the client accepts it."""
+    try:
+        # All messages are admitted together or the whole batch gets a 429
+        tasks = scheduler.submit_many(process_input, [(message,) for message in batch.messages])
+    except SchedulerSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    if not wants_ndjson(request.headers.get("accept")):
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()  # cancels the remaining jobs if one failed or the client left
+        return FastJSONResponse([{"request_id": request_id, "response": reply} for request_id, reply in results])
+
+    async def replies():
+        # In request order, each line sent as soon as it and those before it are done.
+        try:
+            for task in tasks:
+                request_id, reply = await task
+                yield {"request_id": request_id, "response": reply}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(aiter_ndjson(replies()), media_type=NDJSON_MEDIA_TYPE)
+
+@app.post("/respond/stream")
+async def respond_stream(query: Query):
+    """Streams the reply as Server-Sent Events, one `token` event per generated token."""
+    # Starlette stops iterating when the client disconnects, which cancels the generation.
+    return StreamingResponse(
+        sse_stream(stream_input(query.message), heartbeat=SSE_HEARTBEAT),
+        media_type=SSE_MEDIA_TYPE,
+        headers=SSE_HEADERS,
+    )
+
+@app.on_event("startup")
+async def startup():
+    scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    global classifier_batcher
+    await scheduler.close()
+    await aclose_async_client()
+    if classifier_batcher is not None:
+        await classifier_batcher.close()
+        classifier_batcher = None
+
+@app.post("/classify")
+async def classify(request: ClassifyRequest):
+    """Classifies the sentiment of a text with the fine-tuned model."""
+    return await get_classifier_batcher().predict(request.text)
 
 # Example: Run with `uvicorn api.fastapi_app:app --reload`
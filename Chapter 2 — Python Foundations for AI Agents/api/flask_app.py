@@ -1,11 +1,39 @@
 # ==========================================
 # 🌐 Flask Application for AI Agent
 # ==========================================
-from flask import Flask, jsonify, request
-from agent_core import process_input, agent
-import asyncio
+import atexit
+import os
+
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from agent_core import process_input, stream_input, agent
+from utils.async_bridge import BackgroundEventLoop
+from utils.serialization import dumps, loads
+from utils.sse import SSE_HEADERS, SSE_MEDIA_TYPE, sse_event, sse_stream
+
+REQUEST_TIMEOUT = float(os.environ.get("AGENT_REQUEST_TIMEOUT", "30"))
+SSE_HEARTBEAT = float(os.environ.get("AGENT_SSE_HEARTBEAT", "15"))
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify()/get_json() through utils.serialization (orjson when installed)."""
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Bytes straight into the response body, no str round trip.
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+
+# All requests share one event loop running in a background thread.
+event_loop = BackgroundEventLoop()
+event_loop.start()
+atexit.register(event_loop.stop)
 
 @app.route("/status", methods=["GET"])
 def get_status():
@@ -18,13 +46,31 @@ def respond():
     data = request.get_json()
     message = data.get("message", "")
     agent.status = "processing"
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    reply = loop.run_until_complete(process_input(message))
-    agent.status = "idle"
+    try:
+        reply = event_loop.run(process_input(message), timeout=REQUEST_TIMEOUT)
+    except TimeoutError:
+        return jsonify({"error": f"Agent did not respond within {REQUEST_TIMEOUT}s"}), 504
+    finally:
+        agent.status = "idle"
     return jsonify({"response": reply})
 
+@app.route("/respond/stream", methods=["POST"])
+def respond_stream():
+    """Stream the reply as Server-Sent Events, one `token` event per generated token."""
+    message = request.get_json().get("message", "")
+    # Heartbeats keep each wait well under REQUEST_TIMEOUT; a disconnected client
+    # is noticed on the next write, and closing the generator cancels the generation.
+    events = event_loop.iterate(sse_stream(stream_input(message), heartbeat=SSE_HEARTBEAT), timeout=REQUEST_TIMEOUT)
+
+    def with_timeout_error():
+        # A stalled generation ends the stream with an error event, like any other failure.
+        try:
+            yield from events
+        except TimeoutError:
+            yield sse_event({"error": f"Agent did not respond within {REQUEST_TIMEOUT}s"}, event="error")
+
+    return Response(with_timeout_error(), mimetype=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
 # Example: Run with `python api/flask_app.py`
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000, debug=True)
-
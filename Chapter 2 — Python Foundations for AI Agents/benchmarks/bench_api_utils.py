@@ -0,0 +1,93 @@
+# ==========================================
+# 🔌 api_utils: new connection per call vs pooled session vs async fan-out vs cache
+# ==========================================
+# Run from the chapter folder: `python benchmarks/bench_api_utils.py`
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.api_utils import afetch_many, fetch_external_data
+from utils.response_cache import ResponseCache
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """Local stand-in for an external JSON API; counts TCP connections."""
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    connections = 0
+    delay = 0.0
+    body = json.dumps({"price": 42.0, "currency": "USD"}).encode()
+
+    def setup(self):
+        super().setup()
+        with lock:
+            StubAPI.connections += 1
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+lock = threading.Lock()
+
+
+def legacy_fetch(api_url):
+    """The previous fetch_external_data: module-level requests.get, new connection each call."""
+    response = requests.get(api_url, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+
+def measure(name, run, n):
+    StubAPI.connections = 0
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<34}{n / elapsed:>10.0f}{StubAPI.connections:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--delay-ms", type=float, default=5, help="simulated upstream latency")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    StubAPI.delay = args.delay_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPI)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/quote"
+    n = args.requests
+
+    print(f"{n} GETs, upstream delay {args.delay_ms} ms")
+    print(f"{'client':<34}{'req/s':>10}{'connections':>14}")
+    measure("requests.get per call (previous)", lambda: [legacy_fetch(url) for _ in range(n)], n)
+    measure("pooled session", lambda: [fetch_external_data(url) for _ in range(n)], n)
+    measure(f"afetch_many (concurrency {args.concurrency})",
+            lambda: asyncio.run(afetch_many([url] * n, max_concurrency=args.concurrency)), n)
+    cache = ResponseCache(default_ttl=60)
+    measure("afetch_many + ResponseCache", lambda: asyncio.run(
+        afetch_many([url] * n, max_concurrency=args.concurrency, cache=cache)), n)
+    print(f"cache: {cache.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# ==========================================
+# ⚡ Response serialization: framework defaults vs utils.serialization
+# ==========================================
+# Run from the chapter folder: `python benchmarks/bench_serialization.py`
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.api_utils import format_response
+from utils.serialization import BACKEND, dumps, iter_ndjson
+
+SIZES = {"1 KB": 1_000, "100 KB": 100_000, "10 MB": 10_000_000}
+
+
+def retrieval_results(target_bytes, seed=0):
+    """A format_response payload of retrieval hits, about `target_bytes` once encoded."""
+    rng = random.Random(seed)
+    words = ["agent", "vector", "memory", "retrieval", "context", "token", "embedding", "query"]
+    hit = lambda i: {
+        "id": i,
+        "text": " ".join(rng.choices(words, k=12)),
+        "score": rng.random(),
+        "metadata": {"source": f"doc_{i % 50}.pdf", "page": i % 300, "tags": ["kb", "faq"]},
+    }
+    per_hit = len(json.dumps(hit(0)))
+    results = [hit(i) for i in range(max(1, target_bytes // per_hit))]
+    return format_response("Kairos", "search results", {"results": results})
+
+
+def timeit(fn, budget=1.0):
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed > budget:
+            return elapsed / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds per measurement")
+    args = parser.parse_args()
+
+    candidates = {
+        # What FastAPI does for a returned dict: jsonable_encoder, then JSONResponse's json.dumps.
+        "fastapi default": lambda p: json.dumps(jsonable_encoder(p), ensure_ascii=False,
+                                                separators=(",", ":")).encode(),
+        # Flask's DefaultJSONProvider: json.dumps to str, then encoded.
+        "flask default": lambda p: (json.dumps(p) + "\n").encode(),
+        f"dumps ({BACKEND})": dumps,
+        f"ndjson ({BACKEND})": lambda p: b"".join(iter_ndjson(p["data"]["results"])),
+    }
+    print(f"{'payload':<10}" + "".join(f"{name:>20}" for name in candidates))
+    for label, size in SIZES.items():
+        payload = retrieval_results(size)
+        times = [timeit(lambda: encode(payload), args.budget) for encode in candidates.values()]
+        print(f"{label:<10}" + "".join(f"{t * 1000:>17.3f} ms" for t in times))
+
+
+if __name__ == "__main__":
+    main()
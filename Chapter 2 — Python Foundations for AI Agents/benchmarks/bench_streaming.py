@@ -0,0 +1,81 @@
+# ==========================================
+# 📡 Time to first byte: /respond vs /respond/stream (SSE)
+# ==========================================
+# Run from the chapter folder: `python benchmarks/bench_streaming.py`
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import agent_core
+from api import fastapi_app
+
+
+def serve(port):
+    server = uvicorn.Server(uvicorn.Config(fastapi_app.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def timed(client, path, message):
+    """Returns (time to first body byte, total time) for one POST."""
+    start = time.perf_counter()
+    first = None
+    async with client.stream("POST", path, json={"message": message}) as response:
+        async for _ in response.aiter_raw():
+            first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def run(base_url, n, concurrency):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for path in ("/respond", "/respond/stream"):
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one(i):
+                async with semaphore:
+                    return await timed(client, path, f"question {i} about the agent's memory")
+
+            results = await asyncio.gather(*(one(i) for i in range(n)))
+            ttfb, total = zip(*results)
+            print(f"{path:<18}{statistics.median(ttfb) * 1000:>12.1f}{statistics.median(total) * 1000:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--gather-ms", type=float, default=100, help="simulated retrieval before generation")
+    parser.add_argument("--token-ms", type=float, default=20, help="fake LLM time per token")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    async def gather_information():
+        await asyncio.sleep(args.gather_ms / 1000)
+        return {"info": "data received"}
+
+    agent_core.gather_information = gather_information
+    agent_core.TOKEN_DELAY = args.token_ms / 1000
+
+    async def process_input(user_input):
+        # Same reply as stream_input, generated at the same token rate but returned whole.
+        return "".join([token async for token in agent_core.stream_input(user_input)])
+
+    fastapi_app.process_input = process_input
+    server = serve(args.port)
+    print(f"{'endpoint':<18}{'p50 TTFB ms':>12}{'p50 total':>12}")
+    asyncio.run(run(f"http://127.0.0.1:{args.port}", args.requests, args.concurrency))
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# ==========================================
+# 🧪 Flask /respond load test: loop per request vs background loop
+# ==========================================
+# Run from the chapter folder: `python benchmarks/load_test_flask.py --requests 100000`
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import agent_core
+from agent_core import process_input
+from api import flask_app
+from flask import Flask, jsonify, request
+
+
+async def instant_information():
+    """Stand-in for the 1s simulated API call, so only framework overhead is measured."""
+    await asyncio.sleep(0)
+    return {"info": "data received"}
+
+
+def legacy_app():
+    """The previous /respond handler: a new event loop per request, never closed."""
+    app = Flask("legacy")
+
+    @app.route("/respond", methods=["POST"])
+    def respond():
+        message = request.get_json().get("message", "")
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        reply = loop.run_until_complete(process_input(message))
+        return jsonify({"response": reply})
+
+    return app
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def load_test(name, app, n_requests, samples=10):
+    client = app.test_client()
+    latencies = []
+    print(f"\n{name}")
+    print(f"{'requests':>10}{'RSS MB':>10}{'open FDs':>10}")
+    for i in range(n_requests):
+        start = time.perf_counter()
+        response = client.post("/respond", json={"message": f"hello {i}"})
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.data
+        if (i + 1) % max(n_requests // samples, 1) == 0:
+            print(f"{i + 1:>10}{rss_mb():>10.1f}{open_fds():>10}")
+    ordered = sorted(latencies)
+    print(f"mean {statistics.mean(latencies) * 1000:.3f} ms, p50 {ordered[len(ordered) // 2] * 1000:.3f} ms, "
+          f"p99 {ordered[int(len(ordered) * 0.99)] * 1000:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--legacy-requests", type=int, default=None,
+                        help="requests for the old handler (it leaks, so default is --requests / 10)")
+    args = parser.parse_args()
+
+    agent_core.gather_information = instant_information
+    load_test("background event loop (current)", flask_app.app, args.requests)
+    load_test("new event loop per request (previous)", legacy_app(), args.legacy_requests or args.requests // 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,28 +2,154 @@
 # ==========================================
 # 🛠️ API Utilities for AI Agents
 # ==========================================
+import asyncio
+import random
+import threading
+import time
+import weakref
+
 import requests
-import json
+from requests.adapters import HTTPAdapter
+
+from utils.response_cache import ResponseCache
+
+TIMEOUT = 5
+POOL_SIZE = 32
+# Statuses worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+def backoff_delay(attempt: int, base: float = 0.1, cap: float = 5.0):
+    """Exponential backoff with full jitter for retry number `attempt` (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def get_session():
+    """Shared requests.Session: connections are pooled and kept alive across calls."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+def _async_client():
+    """One pooled httpx.AsyncClient per event loop (clients cannot cross loops)."""
+    import httpx
 
-def fetch_external_data(api_url: str):
-    """Fetch data from a public API."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        limits = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+        client = _async_clients[loop] = httpx.AsyncClient(timeout=TIMEOUT, limits=limits)
+    return client
+
+async def aclose_async_client():
+    """Closes the running loop's httpx.AsyncClient; call it before the loop shuts down."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+def _send(method: str, api_url: str, retries: int, **kwargs):
+    """Send a request through the pooled session, retrying transient failures."""
+    session = get_session()
+    for attempt in range(retries + 1):
+        try:
+            response = session.request(method, api_url, timeout=TIMEOUT, **kwargs)
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                time.sleep(backoff_delay(attempt))
+                continue
+            response.raise_for_status()
+            return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt < retries:
+                time.sleep(backoff_delay(attempt))
+                continue
+            raise
+
+def _request(method: str, api_url: str, retries: int, **kwargs):
     try:
-        response = requests.get(api_url, timeout=5)
-        response.raise_for_status()
-        return response.json()
+        return _send(method, api_url, retries, **kwargs).json()
     except requests.exceptions.RequestException as e:
         return {"error": str(e)}
 
-def post_to_external_api(api_url: str, payload: dict):
-    """Send data (POST) to an API endpoint."""
-    headers = {"Content-Type": "application/json"}
+def _is_conditional(headers):
+    return any(name.lower() in ("if-none-match", "if-modified-since") for name in headers or ())
+
+async def _asend(method: str, api_url: str, retries: int, **kwargs):
+    import httpx
+
+    client = _async_client()
+    for attempt in range(retries + 1):
+        try:
+            response = await client.request(method, api_url, **kwargs)
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            # httpx raises on any non-2xx, but a 304 answers a conditional request (see ResponseCache)
+            if not (response.status_code == 304 and _is_conditional(kwargs.get("headers"))):
+                response.raise_for_status()
+            return response
+        except httpx.TransportError:
+            if attempt < retries:
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            raise
+
+async def _arequest(method: str, api_url: str, retries: int, **kwargs):
+    import httpx
+
     try:
-        response = requests.post(api_url, data=json.dumps(payload), headers=headers, timeout=5)
-        response.raise_for_status()
-        return response.json()
+        return (await _asend(method, api_url, retries, **kwargs)).json()
+    except (httpx.HTTPError, ValueError) as e:
+        return {"error": str(e)}
+
+def fetch_external_data(api_url: str, retries: int = 2, cache: ResponseCache = None):
+    """Fetch data from a public API, through `cache` when one is given."""
+    if cache is None:
+        return _request("GET", api_url, retries)
+    try:
+        return cache.fetch(api_url, lambda headers: _send("GET", api_url, retries, headers=headers))
     except requests.exceptions.RequestException as e:
         return {"error": str(e)}
 
+def post_to_external_api(api_url: str, payload: dict, retries: int = 0):
+    """Send data (POST) to an API endpoint.
+
+    Not retried by default since a POST may not be safe to repeat.
+    """
+    return _request("POST", api_url, retries, json=payload)
+
+async def afetch(api_url: str, retries: int = 2, cache: ResponseCache = None):
+    """Async variant of fetch_external_data, e.g. for use inside process_input."""
+    if cache is None:
+        return await _arequest("GET", api_url, retries)
+    import httpx
+
+    try:
+        return await cache.afetch(api_url, lambda headers: _asend("GET", api_url, retries, headers=headers))
+    except (httpx.HTTPError, ValueError) as e:
+        return {"error": str(e)}
+
+async def apost(api_url: str, payload: dict, retries: int = 0):
+    """Async variant of post_to_external_api."""
+    return await _arequest("POST", api_url, retries, json=payload)
+
+async def afetch_many(api_urls, max_concurrency: int = 10, retries: int = 2, cache: ResponseCache = None):
+    """Fetch several URLs concurrently (at most `max_concurrency` at once), in order."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(api_url):
+        async with semaphore:
+            return await afetch(api_url, retries, cache)
+
+    return await asyncio.gather(*(fetch(api_url) for api_url in api_urls))
+
 def format_response(agent_name: str, message: str, data: dict):
     """Format a consistent JSON response for all API layers."""
     return {
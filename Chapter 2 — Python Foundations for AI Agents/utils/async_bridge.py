@@ -0,0 +1,101 @@
+
+# ==========================================
+# 🔁 Background Event Loop for Sync Frameworks
+# ==========================================
+import asyncio
+import concurrent.futures
+import threading
+
+
+class BackgroundEventLoop:
+    """One long-lived asyncio event loop running in a daemon thread.
+
+    Sync code (e.g. Flask views) submits coroutines with `run()` instead of
+    creating a new event loop per request, so loops, selectors and their
+    file descriptors are created once per process.
+    """
+    def __init__(self, name="agent-event-loop"):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    def run(self, coro, timeout=None):
+        """Runs `coro` on the loop and waits for its result.
+
+        On timeout the coroutine is cancelled and TimeoutError is raised.
+        """
+        if self._thread is None:
+            self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            if future.done():
+                raise  # the coroutine's own TimeoutError (the same class on 3.11+)
+            future.cancel()
+            raise TimeoutError(f"Coroutine did not finish within {timeout}s")
+
+    def iterate(self, agen, timeout=None):
+        """Iterates an async generator on the loop from sync code.
+
+        `timeout` bounds the wait for each item: when it expires, `agen` is
+        closed and TimeoutError is raised out of the generator, so callers
+        that stream to clients should catch it and end the stream cleanly.
+        Closing the sync generator (e.g. WSGI servers do so when the client
+        disconnects) closes `agen`.
+        """
+        async def next_item():
+            # Timed out on the loop: wait_for cancels the step and waits for it to unwind,
+            # so agen is no longer running when aclose() is called below.
+            try:
+                return await asyncio.wait_for(agen.__anext__(), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"No item within {timeout}s") from None
+
+        try:
+            while True:
+                try:
+                    yield self.run(next_item())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if self.loop is not None:
+                self.run(agen.aclose(), timeout)
+
+    def stop(self, timeout=5):
+        """Closes the loop's pooled HTTP client, cancels pending tasks, stops the loop and joins its thread."""
+        with self._lock:
+            if self._thread is None:
+                return
+            async def cancel_pending():
+                from utils.api_utils import aclose_async_client
+                await aclose_async_client()
+                tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                asyncio.run_coroutine_threadsafe(cancel_pending(), self.loop).result(timeout)
+            except concurrent.futures.TimeoutError:
+                pass
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            self.loop.close()
+            self._thread = None
+            self.loop = None
@@ -0,0 +1,204 @@
+# ==========================================
+# 🗄️ Response Cache for External API Calls
+# ==========================================
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+
+
+def parse_cache_control(value):
+    """Parse a Cache-Control header into {directive: value or True}."""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    data: object
+    expires: float
+    etag: str = None
+    last_modified: str = None
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires
+
+
+class ResponseCache:
+    """In-memory LRU of decoded JSON responses with an optional on-disk tier.
+
+    Entries live for `max-age` from the response's Cache-Control header,
+    `default_ttl` otherwise; `ttls` maps URL prefixes to a TTL that takes
+    precedence over both, and `no-store` responses are never cached. Stale
+    entries are kept so they can be revalidated with If-None-Match /
+    If-Modified-Since; a 304 just extends them. Concurrent fetches of the
+    same URL share one upstream call ("singleflight").
+
+    Cached data is shared between callers and must be treated as read-only.
+    """
+    def __init__(self, max_entries=1024, default_ttl=60.0, ttls=None, disk_dir=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.revalidated = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._ainflight = {}
+
+    # ----- storage -----
+
+    def _disk_path(self, url):
+        return os.path.join(self.disk_dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _get(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                return entry
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(url)) as f:
+                    entry = CachedResponse(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                return None
+            self._put(entry, write_disk=False)
+            return entry
+        return None
+
+    def _put(self, entry, write_disk=True):
+        with self._lock:
+            self._entries[entry.url] = entry
+            self._entries.move_to_end(entry.url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.disk_dir and write_disk:
+            path = self._disk_path(entry.url)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(asdict(entry), f)
+            os.replace(tmp, path)
+
+    def _ttl(self, url, cache_control):
+        for prefix, ttl in self.ttls.items():
+            if url.startswith(prefix):
+                return ttl
+        if "no-cache" in cache_control:
+            return 0.0
+        try:
+            return float(cache_control["max-age"])
+        except (KeyError, ValueError):
+            return self.default_ttl
+
+    def _conditional_headers(self, entry):
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _store(self, url, entry, response):
+        """Turn an upstream response (requests or httpx) into the data to return."""
+        cache_control = parse_cache_control(response.headers.get("Cache-Control"))
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.revalidated += 1
+            entry.expires = time.time() + self._ttl(url, cache_control)
+            self._put(entry)
+            return entry.data
+        data = response.json()
+        if "no-store" not in cache_control:
+            self._put(CachedResponse(
+                url=url,
+                data=data,
+                expires=time.time() + self._ttl(url, cache_control),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            ))
+        return data
+
+    # ----- fetching -----
+
+    def fetch(self, url, send):
+        """Return the data for `url`, calling `send(headers) -> response` on a miss."""
+        entry = self._get(url)
+        with self._lock:
+            if entry is not None and entry.fresh:
+                self.hits += 1
+                return entry.data
+            flight = self._inflight.get(url)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[url] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return flight.result()
+        try:
+            data = self._store(url, entry, send(self._conditional_headers(entry)))
+            flight.set_result(data)
+            return data
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[url]
+
+    async def afetch(self, url, send):
+        """Async variant of `fetch`; `send(headers)` is a coroutine function."""
+        entry = self._get(url)
+        key = (asyncio.get_running_loop(), url)
+        with self._lock:
+            if entry is not None and entry.fresh:
+                self.hits += 1
+                return entry.data
+            task = self._ainflight.get(key)
+            if task is None:
+                task = self._ainflight[key] = asyncio.ensure_future(self._arefresh(url, entry, send))
+                task.add_done_callback(lambda _: self._ainflight.pop(key, None))
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        # Shielded so one cancelled caller does not cancel the shared upstream call.
+        return await asyncio.shield(task)
+
+    async def _arefresh(self, url, entry, send):
+        return self._store(url, entry, await send(self._conditional_headers(entry)))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "revalidated": self.revalidated,
+                # Share of lookups that did not need an upstream call of their own
+                "saved_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,164 @@
+
+# ==========================================
+# 🚦 Request Scheduler for Agent APIs
+# ==========================================
+import asyncio
+import time
+import uuid
+from collections import deque
+
+
+class SchedulerSaturated(Exception):
+    """Raised when the scheduler's queue is full; APIs should answer 429."""
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values` (q in 0-100); None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class RequestScheduler:
+    """Runs agent coroutines with bounded concurrency and a bounded queue.
+
+    `max_concurrency` worker tasks pull jobs from an asyncio queue. At most
+    `max_concurrency + max_queue` jobs are admitted at once (running plus
+    waiting); beyond that `submit` fails fast with SchedulerSaturated instead
+    of piling up work. Each job waits on its own future, so a slow request
+    never blocks the others behind it, and a caller that is cancelled takes
+    its job (queued or running) and its slot with it.
+
+    Call `start()` from the app's startup hook and `close()` on shutdown.
+    The queue and workers belong to one event loop: if `submit` runs on a
+    different loop (e.g. a second TestClient without `with`), they are
+    rebuilt on that loop rather than left waiting on a loop nobody runs.
+    """
+    def __init__(self, max_concurrency=64, max_queue=256, latency_window=1000):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.in_flight = {}
+        self.completed = 0
+        self.rejected = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._admitted = 0  # running + queued jobs
+        self._queue = None
+        self._workers = []
+        self._loop = None
+
+    def start(self):
+        """Creates the queue and worker tasks on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+        self._admitted = 0
+        self.in_flight.clear()
+
+    def _release(self, job):
+        """Frees a job's admission slot (once, whoever gets there first)."""
+        if self.in_flight.get(job["id"]) is job:
+            del self.in_flight[job["id"]]
+            self._admitted -= 1
+
+    def _cancel(self, job):
+        """Drops a queued job or cancels a running one, freeing its slot right away."""
+        if job["task"] is not None:
+            job["task"].cancel()
+        job["future"].cancel()
+        self._release(job)
+
+    async def _worker(self):
+        while True:
+            job, coro_fn, args = await self._queue.get()
+            if job["future"].done():
+                continue  # the caller went away while the job was queued
+            job["state"] = "running"
+            # The job runs as its own task: cancelling it never cancels the worker,
+            # and a CancelledError here always means the worker itself is stopping.
+            task = job["task"] = asyncio.ensure_future(coro_fn(*args))
+            try:
+                await asyncio.wait([task])
+            except asyncio.CancelledError:
+                self._cancel(job)
+                raise
+            self._release(job)
+            future = job["future"]
+            if future.done():
+                continue
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+    def _admit(self, calls):
+        """Queues `calls` [(coro_fn, args, request_id)] all together or not at all."""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            self.start()
+        if self._admitted + len(calls) > self.max_concurrency + self.max_queue:
+            self.rejected += len(calls)
+            raise SchedulerSaturated(f"No room for {len(calls)} more request(s): "
+                                     f"{self._admitted} running or queued, at most {self.max_queue} may wait")
+        jobs = []
+        for coro_fn, args, request_id in calls:
+            job = {
+                "id": request_id or uuid.uuid4().hex,
+                "state": "queued",
+                "started": time.perf_counter(),
+                "future": self._loop.create_future(),
+                "task": None,
+            }
+            self.in_flight[job["id"]] = job
+            self._admitted += 1
+            self._queue.put_nowait((job, coro_fn, args))
+            jobs.append(job)
+        return jobs
+
+    async def _wait(self, job):
+        try:
+            result = await job["future"]
+        except asyncio.CancelledError:
+            # The caller was cancelled (e.g. the client disconnected): its job goes too.
+            self._cancel(job)
+            raise
+        self.completed += 1
+        self._latencies.append(time.perf_counter() - job["started"])
+        return job["id"], result
+
+    async def submit(self, coro_fn, *args, request_id=None):
+        """Runs `coro_fn(*args)` and returns (request_id, result)."""
+        job, = self._admit([(coro_fn, args, request_id)])
+        return await self._wait(job)
+
+    def submit_many(self, coro_fn, args_list):
+        """Admits one job per args tuple, all or none (SchedulerSaturated).
+
+        Returns a task per job, in order, each resolving to (request_id,
+        result); cancelling a task cancels its job.
+        """
+        jobs = self._admit([(coro_fn, args, None) for args in args_list])
+        return [asyncio.ensure_future(self._wait(job)) for job in jobs]
+
+    def stats(self):
+        latencies = list(self._latencies)
+        p50, p95 = percentile(latencies, 50), percentile(latencies, 95)
+        return {
+            "in_flight": sum(1 for job in self.in_flight.values() if job["state"] == "running"),
+            "queue_depth": sum(1 for job in self.in_flight.values() if job["state"] == "queued"),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "p50_ms": None if p50 is None else round(p50 * 1000, 2),
+            "p95_ms": None if p95 is None else round(p95 * 1000, 2),
+        }
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for job in list(self.in_flight.values()):
+            self._cancel(job)  # still queued: their callers would otherwise wait forever
+        self._workers = []
+        self._queue = None
+        self._loop = None
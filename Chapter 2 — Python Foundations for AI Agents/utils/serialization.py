@@ -0,0 +1,72 @@
+# ==========================================
+# ⚡ JSON Serialization for the API Layers
+# ==========================================
+import dataclasses
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _default(obj):
+    """Encode what the fast backends do not handle natively (pydantic models, sets, numpy)."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    loads = orjson.loads
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _encoder = msgspec.json.Encoder(enc_hook=_default)
+    dumps = _encoder.encode
+    loads = msgspec.json.decode
+else:
+    BACKEND = "json"
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+    loads = json.loads
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def iter_ndjson(items):
+    """Yield one JSON document per item, newline-terminated, for streaming large lists."""
+    for item in items:
+        yield dumps(item) + b"\n"
+
+
+def wants_ndjson(accept_header):
+    """True when the client asked for NDJSON in its Accept header."""
+    return NDJSON_MEDIA_TYPE in (accept_header or "")
+
+
+async def aiter_ndjson(items):
+    """Async variant of iter_ndjson for async iterables."""
+    async for item in items:
+        yield dumps(item) + b"\n"
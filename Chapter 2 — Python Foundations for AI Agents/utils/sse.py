@@ -0,0 +1,56 @@
+# ==========================================
+# 📡 Server-Sent Events for Streaming Replies
+# ==========================================
+import asyncio
+
+from utils.serialization import dumps
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# Stop proxies (nginx) from buffering the stream and caches from storing it.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+HEARTBEAT = b": keep-alive\n\n"
+
+
+def sse_event(data, event=None) -> bytes:
+    """Encode one SSE event; `data` is sent as JSON so newlines in tokens are safe."""
+    head = f"event: {event}\n".encode() if event else b""
+    return head + b"data: " + dumps(data) + b"\n\n"
+
+
+async def sse_stream(tokens, heartbeat: float = 15.0):
+    """Turn an async iterator of tokens into SSE bytes.
+
+    The next token is only requested once the previous event has been
+    consumed, so a slow client slows the generation down instead of
+    buffering it (backpressure). While waiting on a token, a comment line
+    is sent every `heartbeat` seconds to keep idle connections open. When
+    the consumer stops iterating (client disconnect), the pending token
+    and the upstream generator are cancelled.
+    """
+    tokens = aiter(tokens)
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(tokens))
+            done, _ = await asyncio.wait({pending}, timeout=heartbeat)
+            if not done:
+                yield HEARTBEAT
+                continue
+            try:
+                token = pending.result()
+            except StopAsyncIteration:
+                break
+            except Exception as e:
+                yield sse_event({"error": str(e)}, event="error")
+                return
+            finally:
+                pending = None
+            yield sse_event({"token": token}, event="token")
+        yield sse_event({}, event="done")
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        if hasattr(tokens, "aclose"):
+            await tokens.aclose()
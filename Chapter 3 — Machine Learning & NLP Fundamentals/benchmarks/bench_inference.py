@@ -0,0 +1,69 @@
+# ==========================================
+# ⚡ Classifier serving: unbatched vs micro-batched vs quantized
+# ==========================================
+# Run from the chapter folder after fine-tuning:
+#   `python benchmarks/bench_inference.py --model ./models/finetuned_model`
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
+from inference import MicroBatcher, SentimentClassifier
+
+
+async def run_load(predict, texts, concurrency):
+    """Sends `texts` with at most `concurrency` requests in flight; returns latencies and wall time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(text):
+        async with semaphore:
+            start = time.perf_counter()
+            await predict(text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in texts))
+    return np.array(latencies) * 1000, time.perf_counter() - start
+
+
+def unbatched(classifier):
+    async def predict(text):
+        return (await asyncio.get_running_loop().run_in_executor(None, classifier.predict, [text]))[0]
+    return predict
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="./models/finetuned_model")
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    texts = [f"Review {i}: the plot was {'great' if i % 2 else 'dull'} and the acting {'superb' if i % 3 else 'flat'}."
+             for i in range(args.requests)]
+    classifier = SentimentClassifier(args.model)
+    quantized = SentimentClassifier(args.model, quantize=True)
+    modes = {
+        "unbatched": unbatched(classifier),
+        "micro-batched": MicroBatcher(classifier, args.max_batch_size, args.max_wait_ms).predict,
+        "micro-batched int8": MicroBatcher(quantized, args.max_batch_size, args.max_wait_ms).predict,
+    }
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent")
+    print(f"{'mode':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, predict in modes.items():
+        await predict(texts[0])  # warm up
+        latencies, wall = await run_load(predict, texts, args.concurrency)
+        print(f"{name:<20}{len(texts) / wall:>10.1f}{np.percentile(latencies, 50):>10.1f}"
+              f"{np.percentile(latencies, 95):>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+# ==========================================
+# 🗜️ Memory per vector and recall: float vs int8 vs PQ
+# ==========================================
+# Run from the chapter folder: `python benchmarks/bench_quantization.py`
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_vector_index import recall_at_k, synthetic_embeddings
+from utils.vector_index import FlatIndex, Int8Index, PQIndex
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=100)
+    args = parser.parse_args()
+
+    data = synthetic_embeddings(args.n + args.queries, args.dim)
+    vectors, queries = data[:args.n], data[args.n:]
+
+    flat = FlatIndex(args.dim)
+    flat.add(vectors)
+    _, truth = flat.search(queries, args.top_k)
+
+    indexes = {
+        "int8": Int8Index(args.dim, keep_float=True),
+        f"pq m={args.dim // 8}": PQIndex(args.dim, keep_float=True),
+        f"pq m={args.dim // 16}": PQIndex(args.dim, m=args.dim // 16, keep_float=True),
+    }
+    # float64 is what a list of embeddings becomes once sklearn converts it.
+    print(f"n={args.n} dim={args.dim} top_k={args.top_k}")
+    print(f"{'storage':<14}{'bytes/vec':>10}{'recall@k':>10}{f'+rerank {args.rerank}':>14}{'ms/query':>10}")
+    print(f"{'float64':<14}{8 * args.dim:>10}{1.0:>10.3f}{'-':>14}{'-':>10}")
+    print(f"{'float32':<14}{4 * args.dim:>10}{1.0:>10.3f}{'-':>14}{'-':>10}")
+    for name, index in indexes.items():
+        index.add(vectors)
+        start = time.perf_counter()
+        _, rows = index.search(queries, args.top_k, rerank=0)
+        elapsed = (time.perf_counter() - start) / len(queries) * 1000
+        _, reranked = index.search(queries, args.top_k, rerank=args.rerank)
+        print(f"{name:<14}{index.code_size:>10}{recall_at_k(rows, truth):>10.3f}"
+              f"{recall_at_k(reranked, truth):>14.3f}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# ==========================================
+# 🔡 Tokenization latency: reload per call vs cached vs batched
+# ==========================================
+# Run from the chapter folder: `python benchmarks/bench_tokenization.py`
+import argparse
+import os
+import sys
+import time
+
+from transformers import AutoTokenizer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.text_processing import tokenize_batch, tokenize_text
+
+
+def tokenize_uncached(text, model_name):
+    """What tokenize_text used to do: reload the tokenizer on every call."""
+    return AutoTokenizer.from_pretrained(model_name).tokenize(text)
+
+
+def per_call_ms(fn, texts, max_calls=None):
+    """Mean latency per input; slow paths are timed on `max_calls` inputs only."""
+    sample = texts[:max_calls] if max_calls else texts
+    start = time.perf_counter()
+    for text in sample:
+        fn(text)
+    return (time.perf_counter() - start) / len(sample) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="bert-base-uncased")
+    parser.add_argument("--uncached-calls", type=int, default=20,
+                        help="inputs timed on the reload-per-call path (it is extrapolated)")
+    args = parser.parse_args()
+
+    tokenize_text("warm up", args.model)  # first load, also fills the HF disk cache
+    sentence = "The agent stores every user message as an embedding in its vector memory."
+
+    print(f"{'inputs':>8}{'reload ms/call':>16}{'cached ms/call':>16}{'batched ms/input':>18}")
+    for n in (1, 100, 10_000):
+        texts = [f"{sentence} #{i}" for i in range(n)]
+        uncached = per_call_ms(lambda t: tokenize_uncached(t, args.model), texts, args.uncached_calls)
+        cached = per_call_ms(lambda t: tokenize_text(t, args.model), texts)
+        start = time.perf_counter()
+        tokenize_batch(texts, args.model)
+        batched = (time.perf_counter() - start) / n * 1000
+        print(f"{n:>8}{uncached:>16.3f}{cached:>16.3f}{batched:>18.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# ==========================================
+# 📏 Recall@k vs QPS: flat vs IVF index
+# ==========================================
+# Run from the chapter folder: `python benchmarks/bench_vector_index.py`
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.vector_index import FlatIndex, IVFIndex, _normalize
+
+
+def synthetic_embeddings(n, dim, n_topics=500, seed=0):
+    """Clustered unit vectors that roughly mimic sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    vectors = topics[rng.integers(n_topics, size=n)] + rng.normal(size=(n, dim)).astype(np.float32)
+    return _normalize(vectors)
+
+
+def timed_search(index, queries, top_k, **options):
+    start = time.perf_counter()
+    _, rows = index.search(queries, top_k, **options)
+    return rows, len(queries) / (time.perf_counter() - start)
+
+
+def recall_at_k(rows, truth):
+    return np.mean([len(np.intersect1d(r, t)) / len(t) for r, t in zip(rows, truth)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=512)
+    args = parser.parse_args()
+
+    data = synthetic_embeddings(args.n + args.queries, args.dim)
+    vectors, queries = data[:args.n], data[args.n:]
+
+    flat = FlatIndex(args.dim)
+    flat.add(vectors)
+    # One query at a time, as an agent would issue them.
+    truth, flat_qps = [], []
+    for query in queries:
+        rows, qps = timed_search(flat, query[None, :], args.top_k)
+        truth.append(rows[0])
+        flat_qps.append(qps)
+
+    start = time.perf_counter()
+    ivf = IVFIndex(args.dim, nlist=args.nlist)
+    ivf.add(vectors)
+    build = time.perf_counter() - start
+
+    print(f"n={args.n} dim={args.dim} top_k={args.top_k} nlist={args.nlist} (IVF build {build:.1f}s)")
+    print(f"{'index':<16}{'recall@k':>10}{'QPS':>12}")
+    print(f"{'flat':<16}{1.0:>10.3f}{np.median(flat_qps):>12.0f}")
+    for nprobe in (1, 4, 16, 64):
+        results = [timed_search(ivf, query[None, :], args.top_k, nprobe=nprobe) for query in queries]
+        recall = recall_at_k([rows[0] for rows, _ in results], truth)
+        qps = np.median([qps for _, qps in results])
+        print(f"{f'ivf nprobe={nprobe}':<16}{recall:>10.3f}{qps:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
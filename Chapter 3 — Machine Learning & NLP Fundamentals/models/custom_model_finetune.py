@@ -1,34 +1,173 @@
-from transformers import AutoModelForSequenceClassification, Trainer, TrainingArguments, AutoTokenizer
-from datasets import load_dataset
+import os
+import resource
+import time
+from dataclasses import dataclass, field
 
-def fine_tune_model(model_name="distilbert-base-uncased", dataset_name="imdb"):
-    """Basic fine-tuning pipeline for sentiment classification."""
+import torch
+from datasets import load_dataset, load_from_disk
+from datasets.fingerprint import Hasher
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoTokenizer,
+    DataCollatorWithPadding,
+    Trainer,
+    TrainerCallback,
+    TrainingArguments,
+)
+from transformers.trainer_utils import get_last_checkpoint
+from transformers.utils import is_torch_bf16_cpu_available
+
+
+@dataclass
+class CPUTrainingProfile:
+    """Training settings for CPU-only nodes.
+
+    The effective batch size is `per_device_train_batch_size *
+    gradient_accumulation_steps`. bf16 autocast is only enabled when the
+    CPU and the installed torch support it.
+    """
+    intra_op_threads: int = field(default_factory=lambda: os.cpu_count() or 1)
+    inter_op_threads: int = 1
+    per_device_train_batch_size: int = 8
+    gradient_accumulation_steps: int = 1
+    bf16: bool = True
+    dataloader_num_workers: int = 0
+
+    def apply(self):
+        """Configures torch's thread pools; call before any training work starts."""
+        torch.set_num_threads(self.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(self.inter_op_threads)
+        except RuntimeError:
+            # Only settable once per process, before inter-op work has started.
+            pass
+
+    def training_arguments(self):
+        return {
+            "use_cpu": True,
+            "per_device_train_batch_size": self.per_device_train_batch_size,
+            "gradient_accumulation_steps": self.gradient_accumulation_steps,
+            "bf16": self.bf16 and is_torch_bf16_cpu_available(),
+            "dataloader_num_workers": self.dataloader_num_workers,
+        }
+
+
+def peak_rss_mb():
+    """(peak RSS of this process, largest peak RSS of any finished child process), in MB.
+
+    The second figure comes from RUSAGE_CHILDREN, so dataloader workers only
+    count once they have exited and been waited for (e.g. after an epoch).
+    """
+    self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return self_kb / 1024, children_kb / 1024
+
+
+class ThroughputCallback(TrainerCallback):
+    """Prints samples/s for every optimizer step and the peak RSS so far (trainer and workers)."""
+    def on_step_begin(self, args, state, control, **kwargs):
+        self._step_start = time.perf_counter()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        elapsed = time.perf_counter() - self._step_start
+        samples = args.per_device_train_batch_size * args.gradient_accumulation_steps * max(args.n_gpu, 1)
+        main_mb, worker_mb = peak_rss_mb()
+        print(
+            f"step {state.global_step}/{state.max_steps}: {samples / elapsed:.1f} samples/s, "
+            f"peak RSS {main_mb:.0f} MB (dataloader workers: {worker_mb:.0f} MB)"
+        )
+
+
+def tokenize_split(dataset, tokenizer, max_length=512, cache_dir="./cache/tokenized"):
+    """Tokenizes a (pre-selected) split without padding, caching the result on disk.
+
+    The cache key combines the dataset fingerprint (which reflects the source
+    files and any select/shuffle applied) with a hash of the tokenizer, so a
+    rerun with the same inputs loads the shards instead of re-tokenizing.
+    Returns the tokenized dataset and a stats dict for the data stage.
+    """
+    start = time.perf_counter()
+    key = Hasher.hash([dataset._fingerprint, Hasher.hash(tokenizer), max_length])
+    path = os.path.join(cache_dir, key)
+    cached = os.path.isdir(path)
+    if cached:
+        tokenized = load_from_disk(path)
+    else:
+        def tokenize_fn(examples):
+            encoded = tokenizer(examples["text"], truncation=True, max_length=max_length)
+            encoded["length"] = [len(ids) for ids in encoded["input_ids"]]
+            return encoded
+
+        tokenized = dataset.map(tokenize_fn, batched=True, remove_columns=["text"])
+        tokenized.save_to_disk(path)
+    elapsed = time.perf_counter() - start
+    n_tokens = int(sum(tokenized["length"]))
+    return tokenized, {
+        "rows": len(tokenized),
+        "tokens": n_tokens,
+        "seconds": elapsed,
+        "tokens_per_second": n_tokens / elapsed if elapsed else float("inf"),
+        "cached": cached,
+    }
+
+
+def fine_tune_model(model_name="distilbert-base-uncased", dataset_name="imdb",
+                    train_size=1000, eval_size=500, max_length=512, cache_dir="./cache/tokenized",
+                    profile=None, resume=True):
+    """Basic fine-tuning pipeline for sentiment classification.
+
+    Only the rows used for training and evaluation are tokenized, without
+    padding; batches are padded dynamically by the data collator and grouped
+    by length so each batch pads to a similar size. Pass a
+    `CPUTrainingProfile` to train on CPU with explicit threads, precision and
+    accumulation. With `resume`, training continues from the latest
+    checkpoint in ./results if there is one.
+    """
+    if profile is not None:
+        profile.apply()
     tokenizer = AutoTokenizer.from_pretrained(model_name)
     dataset = load_dataset(dataset_name)
-    
-    def tokenize_fn(examples):
-        return tokenizer(examples["text"], truncation=True, padding="max_length")
-    
-    tokenized = dataset.map(tokenize_fn, batched=True)
-    
+
+    splits = {}
+    for split, size in (("train", train_size), ("test", eval_size)):
+        splits[split], stats = tokenize_split(
+            dataset[split].select(range(size)), tokenizer, max_length, cache_dir
+        )
+        print(
+            f"Data stage [{split}]: {stats['rows']} rows, {stats['tokens']} tokens in "
+            f"{stats['seconds']:.2f}s ({stats['tokens_per_second']:,.0f} tokens/s"
+            f"{', from cache' if stats['cached'] else ''})"
+        )
+
     model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=2)
-    
+
+    options = {"per_device_train_batch_size": 8}
+    if profile is not None:
+        options.update(profile.training_arguments())
     training_args = TrainingArguments(
         output_dir="./results",
         evaluation_strategy="epoch",
-        per_device_train_batch_size=8,
-        num_train_epochs=1
+        num_train_epochs=1,
+        group_by_length=True,
+        length_column_name="length",
+        **options,
     )
-    
+
     trainer = Trainer(
         model=model,
         args=training_args,
-        train_dataset=tokenized["train"].select(range(1000)),
-        eval_dataset=tokenized["test"].select(range(500))
+        train_dataset=splits["train"],
+        eval_dataset=splits["test"],
+        data_collator=DataCollatorWithPadding(tokenizer, pad_to_multiple_of=8),
+        callbacks=[ThroughputCallback()],
     )
-    
-    trainer.train()
+
+    last_checkpoint = None
+    if resume and os.path.isdir(training_args.output_dir):
+        last_checkpoint = get_last_checkpoint(training_args.output_dir)
+    trainer.train(resume_from_checkpoint=last_checkpoint)
     model.save_pretrained("./models/finetuned_model")
+    tokenizer.save_pretrained("./models/finetuned_model")
 
 if __name__ == "__main__":
-    fine_tune_model()
+    fine_tune_model(profile=CPUTrainingProfile() if not torch.cuda.is_available() else None)
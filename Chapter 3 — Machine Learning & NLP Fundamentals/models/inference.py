@@ -0,0 +1,104 @@
+import asyncio
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+
+class SentimentClassifier:
+    """Loads the fine-tuned classifier once and predicts in batches.
+
+    With `quantize=True` the Linear layers are converted to dynamic int8
+    quantization, which is usually faster on CPU for a small accuracy cost.
+    """
+    def __init__(self, model_dir="./models/finetuned_model", base_model="distilbert-base-uncased",
+                 quantize=False, max_length=512):
+        try:
+            self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        except OSError:
+            # Older runs saved only the model weights.
+            self.tokenizer = AutoTokenizer.from_pretrained(base_model)
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+        model.eval()
+        if quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        self.max_length = max_length
+
+    def predict(self, texts):
+        """Returns one {"label", "score"} dict per text."""
+        inputs = self.tokenizer(list(texts), truncation=True, max_length=self.max_length,
+                                padding=True, return_tensors="pt")
+        with torch.inference_mode():
+            probabilities = self.model(**inputs).logits.softmax(dim=-1)
+        scores, labels = probabilities.max(dim=-1)
+        return [{"label": int(label), "score": float(score)} for label, score in zip(labels, scores)]
+
+
+class MicroBatcher:
+    """Coalesces concurrent `predict` calls into batches for a classifier.
+
+    Requests arriving within `max_wait_ms` of the first queued one are run
+    together, up to `max_batch_size`. Batches run in a worker thread so the
+    event loop keeps accepting requests meanwhile.
+    """
+    def __init__(self, classifier, max_batch_size=32, max_wait_ms=5):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._worker = None
+
+    async def predict(self, text):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                texts = [text for text, _ in batch]
+                try:
+                    results = await loop.run_in_executor(None, self.classifier.predict, texts)
+                except Exception as e:
+                    self._fail(batch, e)
+                    continue
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        except asyncio.CancelledError:
+            self._fail(batch, RuntimeError("The classifier was shut down"))
+            raise
+
+    @staticmethod
+    def _fail(batch, error):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self):
+        """Stops the worker; requests it has not answered get a RuntimeError instead of hanging."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail(pending, RuntimeError("The classifier was shut down"))
+        self._worker = None
+        self._queue = None
@@ -0,0 +1,86 @@
+import numpy as np
+from utils.vector_index import _grow
+
+MISSING = -1
+
+
+class MetadataColumn:
+    """One metadata field stored column-wise with dictionary encoding.
+
+    Each row holds an int32 code into `values` (or MISSING). Equality
+    filters are answered from a sorted-array index: for every distinct
+    value, the ascending list of rows holding it. The index is built lazily
+    on the first filter and then kept up to date by appends.
+    """
+    def __init__(self, codes=None, values=None):
+        self.values = list(values or [])
+        self._code_of = {value: code for code, value in enumerate(self.values)}
+        self._codes = np.empty(1024, dtype=np.int32) if codes is None else np.array(codes, dtype=np.int32)
+        self._size = 0 if codes is None else len(codes)
+        self._postings = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def codes(self):
+        return self._codes[:self._size]
+
+    def _encode(self, value):
+        if value is None:
+            return MISSING
+        code = self._code_of.get(value)
+        if code is None:
+            code = self._code_of[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, values, start):
+        """Stores `values` for rows `start, start + 1, ...`; earlier unset rows become MISSING."""
+        end = start + len(values)
+        self._codes = _grow(self._codes, end)
+        self._codes[self._size:start] = MISSING
+        new_codes = np.fromiter((self._encode(v) for v in values), dtype=np.int32, count=len(values))
+        self._codes[start:end] = new_codes
+        self._size = end
+        if self._postings is not None:
+            self._index(new_codes, start)
+
+    def _index(self, codes, start):
+        """Adds rows `start + i` to the posting list of `codes[i]`."""
+        order = np.argsort(codes, kind="stable")
+        present, starts = np.unique(codes[order], return_index=True)
+        for code, rows in zip(present, np.split(order + start, starts[1:])):
+            if code == MISSING:
+                continue
+            postings, size = self._postings.get(code, (np.empty(0, dtype=np.int64), 0))
+            postings = _grow(postings, size + len(rows))
+            postings[size:size + len(rows)] = rows
+            self._postings[code] = (postings, size + len(rows))
+
+    def rows_matching(self, values):
+        """Sorted rows whose value is in `values`."""
+        if self._postings is None:
+            self._postings = {}
+            self._index(self.codes, 0)
+        lists = []
+        for value in values:
+            code = self._code_of.get(value)
+            if code in self._postings:
+                postings, size = self._postings[code]
+                lists.append(postings[:size])
+        if len(lists) == 1:
+            return lists[0]
+        return np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int64)
+
+    def get(self, row):
+        code = self._codes[row] if row < self._size else MISSING
+        return None if code == MISSING else self.values[code]
+
+    def compact(self, keep, n_rows):
+        """Keeps only rows `keep` (sorted) of a store holding `n_rows` rows."""
+        codes = np.full(n_rows, MISSING, dtype=np.int32)
+        codes[:self._size] = self.codes
+        self._codes = codes[keep]
+        self._size = len(keep)
+        self._postings = None
@@ -1,12 +1,76 @@
+import threading
+from collections import OrderedDict
+
 from transformers import AutoTokenizer
 
+
+class TokenizerRegistry:
+    """Process-wide, LRU-bounded cache of loaded tokenizers.
+
+    Tokenizers are keyed by model name plus `from_pretrained` options and
+    loaded lazily on first use. Loading happens outside the registry lock
+    (under a per-key lock), so threads asking for an already cached model
+    never wait on another model being read from disk.
+    """
+    def __init__(self, max_size=8):
+        self.max_size = max_size
+        self._tokenizers = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name, **options):
+        key = (model_name, tuple(sorted(options.items())))
+        with self._lock:
+            if key in self._tokenizers:
+                self._tokenizers.move_to_end(key)
+                return self._tokenizers[key]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._tokenizers:
+                    return self._tokenizers[key]
+            tokenizer = AutoTokenizer.from_pretrained(model_name, **options)
+            with self._lock:
+                self._tokenizers[key] = tokenizer
+                while len(self._tokenizers) > self.max_size:
+                    self._tokenizers.popitem(last=False)
+                self._loading.pop(key, None)
+        return tokenizer
+
+    def clear(self):
+        with self._lock:
+            self._tokenizers.clear()
+
+
+tokenizers = TokenizerRegistry()
+
+
+def get_tokenizer(model_name="bert-base-uncased", **options):
+    """Returns the shared tokenizer for `model_name`, loading it on first use."""
+    return tokenizers.get(model_name, **options)
+
+
 def tokenize_text(text: str, model_name="bert-base-uncased"):
     """Tokenizes input text into model-compatible tokens."""
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    tokens = tokenizer.tokenize(text)
-    return tokens
+    return get_tokenizer(model_name).tokenize(text)
+
 
 def text_to_ids(text: str, model_name="bert-base-uncased"):
     """Converts text to token IDs for model input."""
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer = get_tokenizer(model_name)
     return tokenizer(text, return_tensors="pt", truncation=True, padding=True)
+
+
+def tokenize_batch(texts, model_name="bert-base-uncased"):
+    """Tokenizes many texts in one call to the fast (Rust) tokenizer."""
+    tokenizer = get_tokenizer(model_name)
+    if not tokenizer.is_fast:
+        return [tokenizer.tokenize(text) for text in texts]
+    encoding = tokenizer(list(texts), add_special_tokens=False)
+    return [encoding.tokens(i) for i in range(len(texts))]
+
+
+def texts_to_ids_batch(texts, model_name="bert-base-uncased"):
+    """Converts many texts to a padded batch of token IDs for model input."""
+    tokenizer = get_tokenizer(model_name)
+    return tokenizer(list(texts), return_tensors="pt", truncation=True, padding=True)
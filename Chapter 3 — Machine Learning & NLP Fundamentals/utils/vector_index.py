@@ -0,0 +1,478 @@
+import numpy as np
+
+# A search mask selecting at most this fraction of rows is answered by
+# scoring only the selected rows instead of masking a full scan.
+SPARSE_MASK_FRACTION = 0.1
+
+
+def _normalize(vectors):
+    """L2-normalises rows in place; zero vectors are left untouched."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+def _top_k(scores, top_k):
+    """Returns the indices of the top_k highest scores per row, best first."""
+    n = scores.shape[1]
+    k = min(top_k, n)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def _grow(array, needed):
+    """Returns `array` or a copy with doubled capacity holding at least `needed` rows."""
+    if needed <= len(array):
+        return array
+    capacity = max(len(array), 1)
+    while capacity < needed:
+        capacity *= 2
+    grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _pad(scores, rows, top_k):
+    """Pads search results to `top_k` columns; empty or masked-out slots get row -1."""
+    missing = top_k - scores.shape[1]
+    if missing > 0:
+        m = scores.shape[0]
+        scores = np.hstack([scores, np.full((m, missing), -np.inf, dtype=np.float32)])
+        rows = np.hstack([rows, np.full((m, missing), -1, dtype=np.int64)])
+    return scores, np.where(np.isneginf(scores), -1, rows)
+
+
+def _sparse_rows(mask):
+    """Rows selected by `mask` if few enough to gather, else None (scan and mask instead)."""
+    if mask is None:
+        return None
+    rows = np.flatnonzero(mask)
+    return rows if len(rows) <= SPARSE_MASK_FRACTION * len(mask) else None
+
+
+def _remap(keep, n_rows):
+    """Maps old row numbers to their position in `keep`, or -1 if dropped."""
+    new_rows = np.full(n_rows, -1, dtype=np.int64)
+    new_rows[keep] = np.arange(len(keep))
+    return new_rows
+
+
+def spherical_kmeans(vectors, n_clusters, n_iter=10, seed=0, chunk_size=65536):
+    """Clusters normalised vectors by cosine similarity and returns the centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = np.concatenate([
+            np.argmax(vectors[i:i + chunk_size] @ centroids.T, axis=1)
+            for i in range(0, len(vectors), chunk_size)
+        ])
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = np.bincount(assignment, minlength=n_clusters) == 0
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def kmeans(vectors, n_clusters, n_iter=10, seed=0):
+    """Plain Lloyd's k-means (squared Euclidean distance); returns the centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = _nearest(vectors, centroids)
+        counts = np.bincount(assignment, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+def _nearest(vectors, centroids):
+    """Index of the closest centroid (squared Euclidean distance) for each vector."""
+    return np.argmin((centroids ** 2).sum(axis=1) - 2 * vectors @ centroids.T, axis=1)
+
+
+class FlatIndex:
+    """Exact index: scores every stored vector against the query.
+
+    Vectors live in a preallocated float32 matrix that doubles its capacity
+    when full, so a query is a single matrix product over contiguous memory.
+    """
+    def __init__(self, dim, capacity=1024):
+        self.dim = dim
+        self._size = 0
+        self._matrix = np.empty((capacity, dim), dtype=np.float32)
+
+    @classmethod
+    def from_vectors(cls, vectors):
+        """Wraps existing normalised vectors (e.g. a read-only memmap) without copying.
+
+        The first `add` afterwards copies them into a growable in-memory matrix.
+        """
+        index = cls(vectors.shape[1], capacity=0)
+        index._matrix = vectors
+        index._size = len(vectors)
+        return index
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def vectors(self):
+        """Stored vectors (a view, not a copy)."""
+        return self._matrix[:self._size]
+
+    def add(self, vectors):
+        """Appends normalised float32 vectors; their rows follow insertion order."""
+        self._matrix = _grow(self._matrix, self._size + len(vectors))
+        self._matrix[self._size:self._size + len(vectors)] = vectors
+        self._size += len(vectors)
+
+    def search(self, queries, top_k, mask=None):
+        """Returns (scores, rows) arrays of shape (len(queries), top_k).
+
+        `mask` is an optional boolean array over rows; unselected rows are
+        never returned. Missing results have row -1.
+        """
+        subset = _sparse_rows(mask)
+        if subset is not None:
+            scores = queries @ self.vectors[subset].T
+        else:
+            scores = queries @ self.vectors.T
+            if mask is not None:
+                scores[:, ~mask] = -np.inf
+        rows = _top_k(scores, top_k)
+        scores = np.take_along_axis(scores, rows, axis=1)
+        return _pad(scores, rows if subset is None else subset[rows], top_k)
+
+    def compact(self, keep):
+        """Keeps only rows `keep` (sorted), renumbering them from 0."""
+        self._matrix = self.vectors[keep]
+        self._size = len(keep)
+
+
+class IVFIndex:
+    """Approximate inverted-file index with a k-means coarse quantizer.
+
+    Vectors are bucketed by their nearest of `nlist` centroids and a query
+    only scores the buckets of its `nprobe` closest centroids: raising
+    `nprobe` trades speed for recall. Until enough vectors have been added
+    to train the quantizer (`train_size`, by default 40 per list) searches
+    fall back to exact scoring. After training, inserts are assigned to the
+    existing centroids, so nothing is rebuilt; call `train()` again to
+    re-cluster if the data distribution drifts.
+    """
+    def __init__(self, dim, nlist=256, nprobe=8, train_size=None, capacity=1024, seed=0):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or 40 * nlist
+        self.seed = seed
+        self.flat = FlatIndex(dim, capacity)
+        self.centroids = None
+        self._lists = []
+        self._list_sizes = None
+
+    @classmethod
+    def from_vectors(cls, vectors, **options):
+        """Builds the index over existing normalised vectors without copying them."""
+        index = cls(vectors.shape[1], capacity=0, **options)
+        index.flat = FlatIndex.from_vectors(vectors)
+        if len(index) >= index.train_size:
+            index.train()
+        return index
+
+    def __len__(self):
+        return len(self.flat)
+
+    @property
+    def vectors(self):
+        return self.flat.vectors
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def train(self, sample_size=None):
+        """(Re)clusters the stored vectors and rebuilds the inverted lists."""
+        vectors = self.vectors
+        sample_size = sample_size or self.train_size
+        if len(vectors) > sample_size:
+            rng = np.random.default_rng(self.seed)
+            sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        else:
+            sample = vectors
+        self.centroids = spherical_kmeans(sample, min(self.nlist, len(sample)), seed=self.seed)
+        self._lists = [np.empty(16, dtype=np.int64) for _ in range(len(self.centroids))]
+        self._list_sizes = np.zeros(len(self.centroids), dtype=np.int64)
+        self._assign(np.arange(len(vectors)))
+
+    def _assign(self, rows, chunk_size=65536):
+        """Appends `rows` to the inverted list of their nearest centroid."""
+        assignment = np.concatenate([
+            np.argmax(self.vectors[rows[i:i + chunk_size]] @ self.centroids.T, axis=1)
+            for i in range(0, len(rows), chunk_size)
+        ])
+        order = np.argsort(assignment, kind="stable")
+        lists, starts = np.unique(assignment[order], return_index=True)
+        for list_id, chunk in zip(lists, np.split(rows[order], starts[1:])):
+            size = self._list_sizes[list_id]
+            self._lists[list_id] = _grow(self._lists[list_id], size + len(chunk))
+            self._lists[list_id][size:size + len(chunk)] = chunk
+            self._list_sizes[list_id] = size + len(chunk)
+
+    def add(self, vectors):
+        start = len(self.flat)
+        self.flat.add(vectors)
+        if self.is_trained:
+            self._assign(np.arange(start, len(self.flat)))
+        elif len(self.flat) >= self.train_size:
+            self.train()
+
+    def search(self, queries, top_k, mask=None, nprobe=None):
+        # A selective filter leaves few enough rows to score them all exactly.
+        if not self.is_trained or (mask is not None and np.count_nonzero(mask) <= self.train_size):
+            return self.flat.search(queries, top_k, mask)
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probes = _top_k(queries @ self.centroids.T, nprobe)
+        all_scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        all_rows = np.full((len(queries), top_k), -1, dtype=np.int64)
+        for q, (query, lists) in enumerate(zip(queries, probes)):
+            rows = np.concatenate([self._lists[i][:self._list_sizes[i]] for i in lists])
+            if mask is not None:
+                rows = rows[mask[rows]]
+            if not len(rows):
+                continue
+            scores = self.vectors[rows] @ query
+            best = _top_k(scores[None, :], top_k)[0]
+            all_scores[q, :len(best)] = scores[best]
+            all_rows[q, :len(best)] = rows[best]
+        return all_scores, all_rows
+
+    def compact(self, keep):
+        new_rows = _remap(keep, len(self))
+        self.flat.compact(keep)
+        if self.is_trained:
+            for i, lst in enumerate(self._lists):
+                rows = new_rows[lst[:self._list_sizes[i]]]
+                self._lists[i] = rows[rows >= 0]
+                self._list_sizes[i] = len(self._lists[i])
+
+
+class _QuantizedIndex:
+    """Shared plumbing for indexes that search compressed codes.
+
+    Only the codes are kept in memory unless float vectors are available
+    for re-ranking: either `keep_float=True`, or the vectors passed to
+    `from_vectors` (typically the read-only memmap of a saved store, so the
+    exact copy stays on disk). With `rerank=n` the best `n` candidates by
+    approximate score are re-scored exactly before taking the top-k.
+    """
+    def __init__(self, dim, capacity=1024, rerank=0, keep_float=False):
+        self.dim = dim
+        self.rerank = rerank
+        self.flat = FlatIndex(dim, capacity) if keep_float else None
+        self._size = 0
+
+    @classmethod
+    def from_vectors(cls, vectors, chunk_size=65536, **options):
+        """Encodes existing normalised vectors and keeps them (uncopied) for re-ranking."""
+        index = cls(vectors.shape[1], capacity=0, **options)
+        index.flat = FlatIndex.from_vectors(vectors)
+        for i in range(0, len(vectors), chunk_size):
+            index._encode_append(np.asarray(vectors[i:i + chunk_size], dtype=np.float32))
+        return index
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def vectors(self):
+        """Exact vectors when available, otherwise a (lossy) reconstruction from the codes."""
+        if self.flat is not None:
+            return self.flat.vectors
+        return self._decode()
+
+    def add(self, vectors):
+        if self.flat is not None:
+            self.flat.add(vectors)
+        self._encode_append(vectors)
+
+    def compact(self, keep):
+        if self.flat is not None:
+            self.flat.compact(keep)
+        self._compact_codes(keep)
+
+    def search(self, queries, top_k, mask=None, rerank=None, chunk_size=65536):
+        if not self._size:
+            m = len(queries)
+            return _pad(np.empty((m, 0), dtype=np.float32), np.empty((m, 0), dtype=np.int64), top_k)
+        rerank = self.rerank if rerank is None else rerank
+        candidates = max(top_k, rerank) if self.flat is not None else top_k
+        subset = _sparse_rows(mask)
+        if subset is not None:
+            scores = self._scores(queries, subset)
+        else:
+            scores = np.hstack([
+                self._scores(queries, slice(start, start + chunk_size))
+                for start in range(0, self._size, chunk_size)
+            ])
+            if mask is not None:
+                scores[:, ~mask] = -np.inf
+        rows = _top_k(scores, candidates)
+        scores = np.take_along_axis(scores, rows, axis=1)
+        if subset is not None:
+            rows = subset[rows]
+        if candidates > top_k:
+            exact = np.einsum("qd,qkd->qk", queries, self.flat.vectors[rows])
+            scores = np.where(np.isneginf(scores), -np.inf, exact)
+            best = _top_k(scores, top_k)
+            rows = np.take_along_axis(rows, best, axis=1)
+            scores = np.take_along_axis(scores, best, axis=1)
+        return _pad(scores, rows, top_k)
+
+
+class Int8Index(_QuantizedIndex):
+    """Scalar-quantized index: one int8 per dimension plus a float32 scale per vector.
+
+    Uses `dim + 4` bytes per vector instead of `4 * dim` for float32.
+    """
+    def __init__(self, dim, capacity=1024, rerank=0, keep_float=False):
+        super().__init__(dim, capacity, rerank, keep_float)
+        self._codes = np.empty((capacity, dim), dtype=np.int8)
+        self._scales = np.empty(capacity, dtype=np.float32)
+
+    @property
+    def code_size(self):
+        """Bytes of compressed storage per vector."""
+        return self.dim + 4
+
+    def _encode_append(self, vectors):
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1.0
+        end = self._size + len(vectors)
+        self._codes = _grow(self._codes, end)
+        self._scales = _grow(self._scales, end)
+        self._codes[self._size:end] = np.rint(vectors / scales[:, None])
+        self._scales[self._size:end] = scales
+        self._size = end
+
+    def _scores(self, queries, rows):
+        codes = self._codes[:self._size][rows].astype(np.float32)
+        return (queries @ codes.T) * self._scales[:self._size][rows]
+
+    def _compact_codes(self, keep):
+        self._codes = self._codes[keep]
+        self._scales = self._scales[keep]
+        self._size = len(keep)
+
+    def _decode(self):
+        return self._codes[:self._size] * self._scales[:self._size, None]
+
+
+class PQIndex(_QuantizedIndex):
+    """Product-quantized index searched with asymmetric distance computation.
+
+    Each vector is split into `m` sub-vectors and each sub-vector is stored
+    as the one-byte id of its nearest of 256 sub-centroids, so a vector
+    costs `m` bytes. A query is never quantized: its dot products with every
+    sub-centroid are tabulated once and a stored vector's score is the sum
+    of `m` table lookups. Vectors are kept as floats and searched exactly
+    until `train_size` of them have been added to train the codebooks; with
+    `keep_float` those are the rows of `flat`, not a second copy.
+    """
+    def __init__(self, dim, m=None, train_size=10000, capacity=1024, rerank=0, keep_float=False, seed=0):
+        super().__init__(dim, capacity, rerank, keep_float)
+        self.m = m or max(1, dim // 8)
+        if dim % self.m:
+            raise ValueError(f"Dimension {dim} is not divisible into {self.m} sub-vectors")
+        self.train_size = train_size
+        self.seed = seed
+        self.codebooks = None
+        self._codes = np.empty((capacity, self.m), dtype=np.uint8)
+        self._pending = FlatIndex(dim, capacity=0)
+        self._n_pending = 0
+
+    @property
+    def code_size(self):
+        return self.m
+
+    @property
+    def is_trained(self):
+        return self.codebooks is not None
+
+    def _split(self, vectors):
+        return vectors.reshape(len(vectors), self.m, self.dim // self.m)
+
+    def train(self, sample):
+        """Learns one 256-entry codebook per sub-space from `sample`."""
+        parts = self._split(sample)
+        n_centroids = min(256, len(sample))
+        self.codebooks = np.stack([
+            kmeans(parts[:, j], n_centroids, seed=self.seed + j) for j in range(self.m)
+        ])
+
+    @property
+    def _untrained(self):
+        """Where vectors wait for training: `flat` when it exists, else a buffer of their own."""
+        return self.flat if self.flat is not None else self._pending
+
+    def _encode_append(self, vectors):
+        if not self.is_trained:
+            if self.flat is None:
+                self._pending.add(vectors)
+            self._n_pending += len(vectors)
+            if self._n_pending < self.train_size:
+                return
+            # Nothing is encoded before training, so the pending vectors are the first rows
+            vectors = np.asarray(self._untrained.vectors[:self._n_pending], dtype=np.float32)
+            self.train(vectors)
+            self._pending = FlatIndex(self.dim, capacity=0)
+            self._n_pending = 0
+        parts = self._split(vectors)
+        end = self._size + len(vectors)
+        self._codes = _grow(self._codes, end)
+        for j in range(self.m):
+            self._codes[self._size:end, j] = _nearest(parts[:, j], self.codebooks[j])
+        self._size = end
+
+    def __len__(self):
+        return self._size + self._n_pending
+
+    def search(self, queries, top_k, mask=None, rerank=None, chunk_size=65536):
+        if not self.is_trained:
+            return self._untrained.search(queries, top_k, mask)
+        return super().search(queries, top_k, mask, rerank, chunk_size)
+
+    def _scores(self, queries, rows):
+        # tables[q, j, c] = <query q's j-th sub-vector, centroid c of codebook j>
+        tables = np.einsum("qjd,jcd->qjc", self._split(queries), self.codebooks)
+        codes = self._codes[:self._size][rows]
+        scores = np.zeros((len(queries), len(codes)), dtype=np.float32)
+        for j in range(self.m):
+            scores += tables[:, j, codes[:, j]]
+        return scores
+
+    def _compact_codes(self, keep):
+        if not self.is_trained:
+            if self.flat is None:
+                self._pending.compact(keep)
+            self._n_pending = len(keep)
+            return
+        self._codes = self._codes[keep]
+        self._size = len(keep)
+
+    def _decode(self):
+        if not self.is_trained:
+            return self._pending.vectors
+        parts = [self.codebooks[j][self._codes[:self._size, j]] for j in range(self.m)]
+        return np.hstack(parts)
+
+
+INDEX_TYPES = {"flat": FlatIndex, "ivf": IVFIndex, "int8": Int8Index, "pq": PQIndex}
@@ -0,0 +1,171 @@
+import json
+import os
+
+import numpy as np
+
+# On-disk layout of a saved VectorMemory (one directory per store):
+#   manifest.json   dim, count and sidecar sizes; rewritten atomically last
+#   embeddings.f32  raw float32 rows, row-major, append-only
+#   texts.bin       UTF-8 texts concatenated, append-only
+#   texts.idx       int64 end offset of each text in texts.bin, append-only
+#   ids.i64         stable id of each row, append-only
+#   deleted.i64     tombstoned rows in deletion order, append-only
+#   meta.<f>.i32    dictionary code of metadata field <f> per row (-1 if
+#                   unset), append-only; the value dictionaries live in
+#                   the manifest, so metadata values must be JSON types
+# Readers trust only the manifest, so bytes appended by an unfinished save
+# are ignored and several processes can map the same files read-only.
+# Full rewrites (after a compaction) go through new files that replace the
+# old ones, so processes still mapping the old files are unaffected.
+MANIFEST = "manifest.json"
+EMBEDDINGS = "embeddings.f32"
+TEXTS = "texts.bin"
+TEXT_ENDS = "texts.idx"
+IDS = "ids.i64"
+DELETED = "deleted.i64"
+METADATA = "meta.{}.i32"
+FORMAT_VERSION = 2
+
+
+class MappedTexts:
+    """List-like view over a texts sidecar; texts added later stay in memory."""
+    def __init__(self, data, ends):
+        self._data = data
+        self._ends = ends
+        self._extra = []
+
+    def __len__(self):
+        return len(self._ends) + len(self._extra)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i >= len(self._ends):
+            return self._extra[i - len(self._ends)]
+        start = self._ends[i - 1] if i else 0
+        return bytes(self._data[start:self._ends[i]]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def append(self, text):
+        self._extra.append(text)
+
+    def extend(self, texts):
+        self._extra.extend(texts)
+
+
+def read_manifest(path):
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported vector store format: {manifest.get('format')}")
+    return manifest
+
+
+def _write_manifest(path, manifest):
+    tmp = os.path.join(path, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+def _map(path, dtype, count, shape=None):
+    """Read-only memmap of the first `count` items; empty files map to empty arrays."""
+    shape = shape or (count,)
+    if count == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def _append(path, data, keep_bytes):
+    """Truncates `path` to `keep_bytes` (dropping any torn write) and appends `data`.
+
+    With `keep_bytes=0` the file is written anew and swapped in atomically.
+    """
+    if not keep_bytes:
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        return
+    with open(path, "r+b") as f:
+        f.truncate(keep_bytes)
+        f.seek(keep_bytes)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def save_store(path, vectors, texts, ids, next_id, deleted_rows=(), metadata=None, start=0, deleted_start=0):
+    """Writes rows `start:` and tombstones `deleted_start:` of a store to `path`.
+
+    `metadata` maps each field to its (codes, values) pair. Pass `start=0`
+    to (re)write the store from scratch; otherwise only new data is
+    appended to what is already saved. Returns the manifest.
+    """
+    os.makedirs(path, exist_ok=True)
+    if start:
+        manifest = read_manifest(path)
+    else:
+        manifest = {"count": 0, "text_bytes": 0, "deleted": 0, "metadata": {}}
+        deleted_start = 0
+    if manifest["count"] != start or manifest.get("deleted", 0) != deleted_start:
+        raise ValueError(f"Store at {path} does not match the rows being appended")
+    count, dim = len(vectors), vectors.shape[1]
+
+    encoded = [texts[i].encode("utf-8") for i in range(start, count)]
+    ends = manifest["text_bytes"] + np.cumsum([len(t) for t in encoded], dtype=np.int64)
+    _append(os.path.join(path, EMBEDDINGS), np.ascontiguousarray(vectors[start:], dtype=np.float32).tobytes(), start * dim * 4)
+    _append(os.path.join(path, TEXTS), b"".join(encoded), manifest["text_bytes"])
+    _append(os.path.join(path, TEXT_ENDS), ends.tobytes(), start * 8)
+    _append(os.path.join(path, IDS), np.asarray(ids[start:count], dtype=np.int64).tobytes(), start * 8)
+    _append(os.path.join(path, DELETED), np.asarray(deleted_rows[deleted_start:], dtype=np.int64).tobytes(), deleted_start * 8)
+
+    saved_fields = manifest.get("metadata", {})
+    for field, (codes, values) in (metadata or {}).items():
+        # A field first seen after the last save has no file yet: write it whole.
+        first = start if field in saved_fields else 0
+        column = np.full(count - first, -1, dtype=np.int32)
+        column[:max(len(codes) - first, 0)] = codes[first:count]
+        _append(os.path.join(path, METADATA.format(field)), column.tobytes(), first * 4)
+        saved_fields[field] = list(values)
+
+    manifest.update(
+        format=FORMAT_VERSION,
+        dim=int(dim),
+        count=count,
+        text_bytes=int(ends[-1]) if len(ends) else manifest["text_bytes"],
+        next_id=int(next_id),
+        deleted=len(deleted_rows),
+        metadata=saved_fields,
+    )
+    _write_manifest(path, manifest)
+    return manifest
+
+
+def open_store(path):
+    """Maps a saved store read-only without loading the embeddings or texts.
+
+    Returns (manifest, vectors, texts, ids, deleted_rows, metadata) where
+    `metadata` maps each field to its (codes, values) pair.
+    """
+    manifest = read_manifest(path)
+    count, dim = manifest["count"], manifest["dim"]
+    vectors = _map(os.path.join(path, EMBEDDINGS), np.float32, count, shape=(count, dim or 0))
+    texts = MappedTexts(
+        _map(os.path.join(path, TEXTS), np.uint8, manifest["text_bytes"]),
+        _map(os.path.join(path, TEXT_ENDS), np.int64, count),
+    )
+    ids = _map(os.path.join(path, IDS), np.int64, count)
+    deleted_rows = _map(os.path.join(path, DELETED), np.int64, manifest["deleted"])
+    metadata = {
+        field: (_map(os.path.join(path, METADATA.format(field)), np.int32, count), values)
+        for field, values in manifest["metadata"].items()
+    }
+    return manifest, vectors, texts, ids, deleted_rows, metadata
@@ -1,20 +1,260 @@
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+
 import numpy as np
+from utils.metadata_index import MetadataColumn
+from utils.vector_index import INDEX_TYPES, _QuantizedIndex, _grow, _normalize
+from utils.vector_persistence import MANIFEST, open_store, read_manifest, save_store
+
 
 class VectorMemory:
-    """Simple in-memory vector store for agent embeddings."""
-    def __init__(self):
-        self.embeddings = []
+    """Simple in-memory vector store for agent embeddings.
+
+    Embeddings are normalised on insert and handed to a pluggable index
+    backend: "flat" (exact search, the default) or "ivf" (approximate,
+    see `IVFIndex`). Extra keyword arguments configure the backend, e.g.
+    `VectorMemory(index="ivf", nlist=1024, nprobe=16)`.
+
+    Every memory gets a stable integer id and optional metadata (stored
+    column-wise, see `MetadataColumn`), so one store can serve many users:
+    `retrieve(q, where={"user": "u1"})` only searches that user's memories.
+    Deleted memories are tombstoned and physically dropped by `compact()`,
+    which runs automatically once they exceed `compact_threshold` of rows.
+
+    `save()` / `load()` persist the store to a directory whose embedding
+    matrix is memory-mapped on load, so several workers can share one copy
+    through the OS page cache (see `utils.vector_persistence`).
+    """
+    def __init__(self, dim=None, index="flat", compact_threshold=0.25, **index_options):
         self.texts = []
+        self.metadata = {}
+        self.compact_threshold = compact_threshold
+        if isinstance(index, str):
+            self.index = None
+            self._index_type = INDEX_TYPES[index]
+            self._index_options = index_options
+            if dim is not None:
+                self.index = self._index_type(dim, **index_options)
+        else:
+            self.index = index
+        self.dim = dim if self.index is None else self.index.dim
+        # Rows follow insertion order; ids survive compaction, rows do not.
+        self._ids = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        self._row_of_id = np.empty(0, dtype=np.int64)
+        self._next_id = 0
+        self._deleted_rows = []
+        self._saved = (None, 0, 0)
+
+    def __len__(self):
+        return len(self.texts) - len(self._deleted_rows)
+
+    @property
+    def embeddings(self):
+        """Normalised embeddings in row order, tombstoned rows included (a view, not a copy)."""
+        if self.index is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self.index.vectors
+
+    def _as_matrix(self, vectors):
+        vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+        if self.index is None:
+            self.dim = vectors.shape[1]
+            self.index = self._index_type(self.dim, **self._index_options)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected embeddings of dimension {self.dim}, got {vectors.shape[1]}")
+        return _normalize(vectors)
+
+    def _row(self, memory_id):
+        row = self._row_of_id[memory_id] if 0 <= memory_id < self._next_id else -1
+        if row < 0:
+            raise KeyError(f"No memory with id {memory_id}")
+        return row
+
+    def add(self, text, embedding, metadata=None):
+        """Adds one memory and returns its id."""
+        return int(self.add_batch([text], [embedding], None if metadata is None else [metadata])[0])
+
+    def add_batch(self, texts, embeddings, metadata=None):
+        """Adds several memories at once and returns their ids.
+
+        `metadata` is an optional list with one dict per memory, such as
+        `{"user": "u1", "session": 7}`.
+        """
+        vectors = self._as_matrix(embeddings)
+        if len(texts) != len(vectors) or (metadata is not None and len(metadata) != len(vectors)):
+            raise ValueError("texts, embeddings and metadata must have the same length")
+        ids = np.arange(self._next_id, self._next_id + len(vectors))
+        self._next_id += len(vectors)
+        self._append(texts, vectors, metadata, ids)
+        return ids
+
+    def _append(self, texts, vectors, metadata, ids):
+        start = len(self.texts)
+        end = start + len(ids)
+        self.index.add(vectors)
+        self.texts.extend(texts)
+        self._ids = _grow(self._ids, end)
+        self._ids[start:end] = ids
+        self._alive = _grow(self._alive, end)
+        self._alive[start:end] = True
+        self._row_of_id = _grow(self._row_of_id, self._next_id)
+        self._row_of_id[ids] = np.arange(start, end)
+        if metadata is not None:
+            for field in {field for item in metadata for field in item}:
+                column = self.metadata.setdefault(field, MetadataColumn())
+                column.append([item.get(field) for item in metadata], start)
+
+    def get(self, memory_id):
+        """Returns the (text, metadata) of a memory."""
+        row = self._row(memory_id)
+        values = {field: column.get(row) for field, column in self.metadata.items()}
+        return self.texts[row], {field: value for field, value in values.items() if value is not None}
 
-    def add(self, text, embedding):
-        self.embeddings.append(embedding)
-        self.texts.append(text)
+    def delete(self, ids):
+        """Deletes memories by id and returns how many existed."""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        ids = np.unique(ids[(ids >= 0) & (ids < self._next_id)])
+        rows = self._row_of_id[ids]
+        rows = rows[rows >= 0]
+        self._tombstone(rows)
+        self._maybe_compact()
+        return len(rows)
 
-    def retrieve(self, query_vector, top_k=1):
+    def update(self, memory_id, text, embedding, metadata=None):
+        """Replaces a memory's text and embedding, keeping its id.
+
+        Its metadata is kept unless a new `metadata` dict is given, which
+        replaces it as a whole.
+        """
+        if metadata is None:
+            metadata = self.get(memory_id)[1]
+        row = self._row(memory_id)
+        vectors = self._as_matrix([embedding])
+        self._tombstone(np.array([row]))
+        self._append([text], vectors, [metadata], np.array([memory_id]))
+        self._maybe_compact()
+
+    def _tombstone(self, rows):
+        self._alive[rows] = False
+        self._row_of_id[self._ids[rows]] = -1
+        self._deleted_rows.extend(rows.tolist())
+
+    def _maybe_compact(self):
+        if len(self._deleted_rows) > self.compact_threshold * len(self.texts):
+            self.compact()
+
+    def compact(self):
+        """Drops tombstoned rows from the index, texts and metadata."""
+        if not self._deleted_rows:
+            return
+        n_rows = len(self.texts)
+        keep = np.flatnonzero(self._alive[:n_rows])
+        self.index.compact(keep)
+        self.texts = [self.texts[i] for i in keep]
+        for column in self.metadata.values():
+            column.compact(keep, n_rows)
+        self._ids = self._ids[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._row_of_id[:self._next_id] = -1
+        self._row_of_id[self._ids] = np.arange(len(keep))
+        self._deleted_rows = []
+        # Rows were renumbered, so the next save has to rewrite the store.
+        self._saved = (None, 0, 0)
+
+    def _mask(self, where):
+        """Boolean row mask of live memories matching `where`; None when every row qualifies.
+
+        `where` maps metadata fields to a value or a list of accepted values.
+        Matching rows come from each field's sorted-array index, so building
+        the mask is a few vectorised writes whatever the selectivity.
+        """
+        n_rows = len(self.texts)
+        mask = self._alive[:n_rows].copy() if self._deleted_rows else None
+        for field, values in (where or {}).items():
+            if not isinstance(values, (list, tuple, set, frozenset)):
+                values = [values]
+            selected = np.zeros(n_rows, dtype=bool)
+            if field in self.metadata:
+                selected[self.metadata[field].rows_matching(values)] = True
+            mask = selected if mask is None else mask & selected
+        return mask
+
+    def save(self, path):
+        """Checkpoints the store to `path`.
+
+        Saving again to the same directory only appends the memories and
+        deletions since the last save or load, then swaps in a new manifest.
+        A quantized index ("int8", "pq") needs `keep_float=True` (or to have
+        been loaded from disk): its codes alone cannot give back the exact
+        embeddings the store is saved as.
+        """
+        if isinstance(self.index, _QuantizedIndex) and self.index.flat is None:
+            raise ValueError("Cannot save a quantized index without its float vectors; create it with keep_float=True")
+        path = os.path.abspath(path)
+        saved_path, start, deleted_start = self._saved
+        if saved_path != path or not os.path.exists(os.path.join(path, MANIFEST)):
+            start = deleted_start = 0
+        elif start:
+            if read_manifest(path)["count"] != start:
+                start = deleted_start = 0
+        n_rows = len(self.texts)
+        save_store(
+            path, self.embeddings, self.texts, self._ids[:n_rows], self._next_id, self._deleted_rows,
+            {field: (column.codes, column.values) for field, column in self.metadata.items()},
+            start, deleted_start,
+        )
+        self._saved = (path, n_rows, len(self._deleted_rows))
+
+    @classmethod
+    def load(cls, path, index="flat", compact_threshold=0.25, **index_options):
+        """Opens a saved store; embeddings are memory-mapped read-only, not read into RAM.
+
+        `index` names the backend to rebuild ("flat", "ivf", "int8" or "pq"),
+        configured by `index_options`. With the flat index this takes
+        milliseconds regardless of size. Adding to a loaded store first copies
+        the mapped embeddings into memory.
+        """
+        if not isinstance(index, str):
+            raise TypeError(f"load() takes an index type name such as 'flat', not {type(index).__name__}")
+        manifest, vectors, texts, ids, deleted_rows, metadata = open_store(path)
+        memory = cls(index=index, compact_threshold=compact_threshold, **index_options)
+        n_rows = manifest["count"]
+        if n_rows:
+            memory.index = memory._index_type.from_vectors(vectors, **index_options)
+            memory.dim = manifest["dim"]
+        memory.texts = texts
+        memory.metadata = {field: MetadataColumn(codes, values) for field, (codes, values) in metadata.items()}
+        memory._ids = np.array(ids, dtype=np.int64)
+        memory._alive = np.ones(n_rows, dtype=bool)
+        memory._alive[deleted_rows] = False
+        memory._next_id = manifest["next_id"]
+        memory._row_of_id = np.full(memory._next_id, -1, dtype=np.int64)
+        live = np.flatnonzero(memory._alive)
+        memory._row_of_id[memory._ids[live]] = live
+        memory._deleted_rows = np.asarray(deleted_rows).tolist()
+        memory._saved = (os.path.abspath(path), n_rows, len(deleted_rows))
+        return memory
+
+    def retrieve(self, query_vector, top_k=1, where=None, with_ids=False, **search_options):
         """Retrieve most similar memories using cosine similarity."""
-        if not self.embeddings:
-            return []
-        similarities = cosine_similarity([query_vector], self.embeddings)[0]
-        top_indices = np.argsort(similarities)[::-1][:top_k]
-        return [(self.texts[i], similarities[i]) for i in top_indices]
+        return self.retrieve_batch([query_vector], top_k, where, with_ids, **search_options)[0]
+
+    def retrieve_batch(self, queries, top_k=1, where=None, with_ids=False, **search_options):
+        """Answers several queries at once.
+
+        Results are (text, score) pairs, or (id, text, score) with
+        `with_ids=True`. `where` restricts the search to memories whose
+        metadata matches (see `_mask`); options such as `nprobe` go to the
+        index.
+        """
+        mask = self._mask(where)
+        if not len(self) or (mask is not None and not mask.any()):
+            return [[] for _ in queries]
+        scores, rows = self.index.search(self._as_matrix(queries), top_k, mask=mask, **search_options)
+        return [
+            [
+                (int(self._ids[i]), self.texts[i], float(score)) if with_ids else (self.texts[i], float(score))
+                for i, score in zip(row, row_scores) if i >= 0
+            ]
+            for row, row_scores in zip(rows, scores)
+        ]
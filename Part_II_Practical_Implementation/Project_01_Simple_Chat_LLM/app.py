@@ -1,5 +1,13 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-from groq import Groq  
+
+# Shared LLM clients live one level up (Part_II_Practical_Implementation/llm_clients.py)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from llm_clients import get_llm
+from context_manager import ChatContext, make_summarizer
+from stream_renderer import StreamRenderer
 
 # 1. Page Configuration
 st.set_page_config(page_title="Llama 3 Chat Agent", page_icon="🦙")
@@ -26,6 +34,9 @@ with st.sidebar:
         ["llama-3.3-70b-versatile", "llama-3.1-8b-instant", "mixtral-8x7b-32768"]
     )
     
+    # Historial enviado al modelo: turnos recientes + resumen de los anteriores
+    context_budget = st.slider("Context budget (tokens)", 500, 8000, 3000, step=500)
+
     st.markdown("---")
     st.markdown("### How it works")
     st.markdown("This agent uses **Groq** for ultra-fast inference using open-source models like Llama 3.")
@@ -33,6 +44,10 @@ with st.sidebar:
 # 3. Initialize Chat History
 if "messages" not in st.session_state:
     st.session_state["messages"] = [{"role": "assistant", "content": "Hello! I am running on Llama 3. How can I help you?"}]
+if "context" not in st.session_state:
+    st.session_state["context"] = ChatContext()
+context = st.session_state["context"]
+context.budget = context_budget
 
 # 4. Display Chat Messages
 for msg in st.session_state.messages:
@@ -42,8 +57,9 @@ for msg in st.session_state.messages:
 # 5. Handle User Input
 if prompt := st.chat_input("Type your message here..."):
     
-    # CAMBIO 3: Cliente de Groq
-    client = Groq(api_key=api_key)
+    # CAMBIO 3: Cliente de Groq (compartido, se reutiliza entre mensajes)
+    llm = get_llm(api_key)
+    context.summarize = make_summarizer(llm, model_choice)
 
     # Add user message
     st.session_state.messages.append({"role": "user", "content": prompt})
@@ -57,24 +73,25 @@ if prompt := st.chat_input("Type your message here..."):
         
         try:
             # CAMBIO 4: La estructura de llamada es idéntica a OpenAI
-            stream = client.chat.completions.create(
+            stream = llm.stream(
                 model=model_choice,
-                messages=[
-                    {"role": m["role"], "content": m["content"]}
-                    for m in st.session_state.messages
-                ],
-                stream=True,
+                messages=context.build(st.session_state.messages),
             )
             
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    full_response += chunk.choices[0].delta.content
-                    message_placeholder.markdown(full_response + "▌")
+            # Redibuja como máximo ~15 veces por segundo en lugar de una vez por token
+            renderer = StreamRenderer(message_placeholder.markdown, max_fps=15)
+            for token in stream:
+                renderer.add(token)
             
-            message_placeholder.markdown(full_response)
+            full_response = renderer.finish()
         
         except Exception as e:
             st.error(f"Error: {e}")
             st.stop()
 
     st.session_state.messages.append({"role": "assistant", "content": full_response})
+    stats = context.stats
+    st.caption(
+        f"Prompt: {stats['prompt_tokens']} tokens of {stats['history_tokens']} in history "
+        f"({stats['messages_sent']} messages sent, {stats['messages_summarized']} summarized)"
+    )
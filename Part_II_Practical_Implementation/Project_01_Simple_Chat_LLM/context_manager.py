@@ -0,0 +1,135 @@
+from concurrent.futures import ThreadPoolExecutor
+
+# Per-message cost of role markers and separators in the chat template
+MESSAGE_OVERHEAD = 4
+
+# Summaries of every ChatContext run here. Contexts live in Streamlit sessions, which
+# end without a hook, so a per-context pool would leak its thread; LLM calls mostly
+# wait on the network, so a few threads serve many sessions.
+_summary_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chat-summary")
+
+SUMMARY_PROMPT = """You maintain the memory of a long conversation between a user and an assistant.
+Update the summary with the new messages. Keep facts, names, numbers, decisions and open
+questions; drop small talk. Answer with the updated summary only, in under 200 words."""
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token); no tokenizer download needed."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def make_summarizer(llm, model):
+    """Builds a `summarize(previous_summary, messages)` function on top of an llm_clients LLM."""
+    def summarize(previous_summary, messages):
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        return llm.complete(
+            model=model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Current summary:\n{previous_summary or '(empty)'}\n\nNew messages:\n{transcript}"},
+            ],
+            temperature=0,
+        )
+    return summarize
+
+
+class ChatContext:
+    """
+    Decides what part of the chat history is sent to the model each turn.
+
+    1. Token counts are computed once per message and cached (history is append-only).
+    2. The newest messages are kept while they fit in `budget` tokens.
+    3. Older messages are folded into a rolling summary by a background thread
+       (shared by all contexts), so the turn that triggers it does not wait for
+       the extra LLM call.
+    """
+
+    def __init__(self, budget=3000, summarize=None, count_tokens=estimate_tokens, summarize_ratio=0.5):
+        self.budget = budget
+        self.summarize = summarize
+        self.count_tokens = count_tokens
+        # When summarizing, fold enough history to bring the window down to this share of the budget
+        self.summarize_ratio = summarize_ratio
+        self.reset()
+
+    def reset(self):
+        self.counts = []
+        self.history_tokens = 0
+        self.summary = ""
+        self.summary_tokens = 0
+        self.summarized = 0  # messages[:summarized] are covered by `summary`
+        self.stats = {}
+        self._pending = None  # (future, upto); a running summary is simply discarded
+
+    def _count_new(self, messages):
+        if len(messages) < len(self.counts):
+            # History was reset (e.g. "clear chat"): start over
+            self.reset()
+        for message in messages[len(self.counts):]:
+            count = self.count_tokens(message["content"]) + MESSAGE_OVERHEAD
+            self.counts.append(count)
+            self.history_tokens += count
+
+    def _collect_summary(self):
+        if self._pending is None or not self._pending[0].done():
+            return
+        future, upto = self._pending
+        self._pending = None
+        try:
+            summary = future.result()
+        except Exception:
+            return  # keep the previous summary; retried on a later turn
+        self.summary = summary
+        self.summary_tokens = self.count_tokens(summary) + MESSAGE_OVERHEAD
+        self.summarized = upto
+
+    def _schedule_summary(self, messages, start):
+        """Summarize from `summarized` up to at least `start`, leaving headroom for later turns."""
+        if self.summarize is None or self._pending is not None:
+            return
+        target = self.budget * self.summarize_ratio
+        upto, kept = len(messages), 0
+        while upto > start and kept + self.counts[upto - 1] <= target:
+            upto -= 1
+            kept += self.counts[upto]
+        upto = min(upto, len(messages) - 1)  # always keep the newest message verbatim
+        if upto <= self.summarized:
+            return
+        batch = [dict(m) for m in messages[self.summarized:upto]]
+        future = _summary_executor.submit(self.summarize, self.summary, batch)
+        self._pending = (future, upto)
+
+    def build(self, messages):
+        """Returns the messages to send: the rolling summary, then the newest turns within budget."""
+        self._count_new(messages)
+        self._collect_summary()
+
+        available = self.budget - (self.summary_tokens if self.summary else 0)
+        start, used = len(messages), 0
+        while start > self.summarized:
+            cost = self.counts[start - 1]
+            if used + cost > available and start < len(messages):
+                break
+            start -= 1
+            used += cost
+        if start > self.summarized:
+            self._schedule_summary(messages, start)
+
+        prompt = []
+        if self.summary:
+            prompt.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+            used += self.summary_tokens
+        prompt += [{"role": m["role"], "content": m["content"]} for m in messages[start:]]
+
+        self.stats = {
+            "prompt_tokens": used,
+            "history_tokens": self.history_tokens,
+            "messages_sent": len(messages) - start,
+            "messages_summarized": self.summarized,
+        }
+        return prompt
+
+    def wait(self, timeout=None):
+        """Blocks until a pending summary is done (for tests and benchmarks)."""
+        if self._pending is not None:
+            self._pending[0].exception(timeout)
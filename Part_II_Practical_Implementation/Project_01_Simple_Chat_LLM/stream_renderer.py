@@ -0,0 +1,42 @@
+import time
+
+
+class StreamRenderer:
+    """
+    Collects streamed tokens and redraws the UI at a bounded rate.
+
+    Tokens are buffered in a list (no quadratic `text += token`) and the
+    placeholder is redrawn at most `max_fps` times per second, or every
+    `every_n_tokens` tokens if given. `finish()` renders the full reply once.
+    """
+
+    def __init__(self, render, max_fps=15, every_n_tokens=None, cursor="▌", clock=time.perf_counter):
+        self.render = render
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self.every_n_tokens = every_n_tokens
+        self.cursor = cursor
+        self.clock = clock
+        self.updates = 0
+        self._text = ""
+        self._pending = []
+        self._last_flush = float("-inf")  # the first token is shown right away
+
+    def add(self, token):
+        self._pending.append(token)
+        if self.every_n_tokens and len(self._pending) >= self.every_n_tokens:
+            self.flush()
+        elif self.clock() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self, final=False):
+        if self._pending:
+            self._text += "".join(self._pending)
+            self._pending.clear()
+        self.render(self._text if final else self._text + self.cursor)
+        self.updates += 1
+        self._last_flush = self.clock()
+
+    def finish(self):
+        """Renders the complete text without the cursor and returns it."""
+        self.flush(final=True)
+        return self._text
@@ -1,6 +1,7 @@
 import streamlit as st
-import pandas as pd
-from utils import execute_pandas_code
+from utils import cache_stats, dataframe_fingerprint, execute_pandas_code
+from data_loader import load_csv
+from sandbox import get_pool
 
 st.set_page_config(page_title="CSV Data Analyst", page_icon="📊")
 
@@ -16,12 +17,26 @@ with st.sidebar:
     else:
         api_key = st.text_input("Groq API Key", type="password")
 
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_dataframe(file_id, _uploaded_file):
+    """Parsed once per upload (shared by reruns); repeated uploads of a file reuse its Arrow cache."""
+    return load_csv(_uploaded_file)
+
 # 2. File Uploader
 uploaded_file = st.file_uploader("Upload a CSV file", type="csv")
 
 if uploaded_file:
     # Load Data
-    df = pd.read_csv(uploaded_file)
+    with st.spinner("Loading data..."):
+        df, load_info = load_dataframe(uploaded_file.file_id, uploaded_file)
+    st.caption(
+        f"{load_info['rows']:,} rows, {load_info['memory_mb']:.0f} MB in memory, "
+        f"loaded from {load_info['source']} in {load_info['seconds']:.1f}s"
+    )
+    # Fingerprint once per upload: it keys the schema prompt and generated-code caches
+    if st.session_state.get("file_id") != uploaded_file.file_id:
+        st.session_state.file_id = uploaded_file.file_id
+        st.session_state.fingerprint = dataframe_fingerprint(df)
     st.write("### Data Preview")
     st.dataframe(df.head())
 
@@ -35,7 +50,11 @@ if uploaded_file:
             st.stop()
             
         with st.spinner("🤖 Generating pandas code and calculating..."):
-            result, code = execute_pandas_code(df, query, api_key)
+            # Generated code runs in worker processes (time + memory limits), not in the app
+            sandbox = get_pool(load_info["cache_path"]) if load_info["cache_path"] else None
+            result, code = execute_pandas_code(
+                df, query, api_key, fingerprint=st.session_state.fingerprint, sandbox=sandbox
+            )
             
             # 4. Display Results
             st.subheader("💡 Answer:")
@@ -44,5 +63,8 @@ if uploaded_file:
             with st.expander("See the code I wrote"):
                 st.code(code, language="python")
 
+    stats = cache_stats()["code"]
+    st.sidebar.caption(f"⚡ Code cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%})")
+
 else:
     st.info("Please upload a CSV file to begin.")
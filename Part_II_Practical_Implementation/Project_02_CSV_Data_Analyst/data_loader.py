@@ -0,0 +1,128 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Columnar copies of uploaded CSVs, named by the file's hash
+CACHE_DIR = Path(os.environ.get("CSV_CACHE_DIR", Path(__file__).resolve().parent / ".csv_cache"))
+
+# An object column becomes a categorical when at most this share of the sampled values are distinct
+CATEGORY_RATIO = 0.5
+
+def file_digest(file, block_size=1 << 20):
+    """sha256 of a file-like object, read in blocks; the position is restored afterwards."""
+    position = file.tell()
+    file.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: file.read(block_size), b""):
+        digest.update(block)
+    file.seek(position)
+    return digest.hexdigest()
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+
+def infer_dtypes(file, sample_rows=50_000, downcast_floats=False):
+    """
+    The dtype= mapping for pd.read_csv, from the first `sample_rows` rows: low-cardinality
+    text columns become categoricals and, with `downcast_floats`, floats become float32.
+    """
+    position = file.tell()
+    sample = pd.read_csv(file, nrows=sample_rows)
+    file.seek(position)
+    dtypes = {}
+    for column in sample.columns:
+        series = sample[column]
+        if _is_text(series) and series.nunique() <= CATEGORY_RATIO * len(sample):
+            dtypes[column] = "category"
+        elif downcast_floats and pd.api.types.is_float_dtype(series.dtype):
+            dtypes[column] = "float32"
+    return dtypes
+
+def shrink(chunk):
+    """Downcasts integer columns; read_csv can't, since a later chunk may need the full width."""
+    for column in chunk.columns:
+        if pd.api.types.is_integer_dtype(chunk[column].dtype):
+            chunk[column] = pd.to_numeric(chunk[column], downcast="integer")
+    return chunk
+
+def read_csv_chunked(file, chunksize=250_000, sample_rows=50_000, downcast_floats=False):
+    """
+    Parses a CSV chunk by chunk into an Arrow table. Chunks are parsed straight into
+    compact dtypes and handed to Arrow as they are read (numeric columns without a
+    copy), so the file never exists in memory with pandas' default (wide) dtypes and
+    the chunks are never concatenated into a second copy: the table keeps them as
+    they are, widening integers where chunks disagree and giving categoricals one
+    shared dictionary.
+    """
+    dtypes = infer_dtypes(file, sample_rows, downcast_floats)
+    tables = [
+        pa.Table.from_pandas(shrink(chunk), preserve_index=False)
+        for chunk in pd.read_csv(file, chunksize=chunksize, dtype=dtypes)
+    ]
+    return pa.concat_tables(tables, promote_options="permissive").unify_dictionaries()
+
+def map_arrow(path):
+    """
+    The DataFrame stored in an Arrow IPC file, memory-mapped. String columns stay
+    Arrow arrays over the mapped pages; numeric columns and categorical codes are
+    copied into the process.
+    """
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+
+def private_copy(df):
+    """
+    A copy that generated code can change freely, in place or not, without touching `df`.
+
+    With Copy-on-Write (always on from pandas 3) a shallow copy is enough, since data
+    is copied the first time it is modified; older pandas needs a deep copy.
+    """
+    copy_on_write = int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+    return df.copy(deep=not copy_on_write)
+
+def load_csv(file, use_cache=True, cache_dir=CACHE_DIR, **read_options):
+    """
+    Loads an uploaded CSV (any binary file-like object) as a compact DataFrame.
+
+    With `use_cache`, the parsed table is written as an uncompressed Arrow IPC
+    (Feather) file named by the CSV's hash and the DataFrame is read back from
+    it memory-mapped; later loads of the same file skip parsing the CSV.
+
+    Returns (df, info) where info has the source, digest, rows, memory, seconds and cache path.
+    """
+    start = time.perf_counter()
+    file.seek(0)
+    digest = file_digest(file)
+    cache_path = Path(cache_dir) / f"{digest}.arrow"
+
+    if use_cache and cache_path.exists():
+        df = map_arrow(cache_path)
+        source_name = "cache"
+    elif use_cache:
+        table = read_csv_chunked(file, **read_options)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        del table
+        pa.default_memory_pool().release_unused()  # the mapped file replaces the table in memory
+        os.replace(tmp_path, cache_path)
+        df = map_arrow(cache_path)
+        source_name = "csv"
+    else:
+        df = read_csv_chunked(file, **read_options).to_pandas(split_blocks=True, self_destruct=True)
+        source_name = "csv"
+
+    info = {
+        "source": source_name,
+        "digest": digest,
+        "rows": len(df),
+        "memory_mb": df.memory_usage(deep=True).sum() / 1e6,
+        "seconds": time.perf_counter() - start,
+        "cache_path": str(cache_path) if use_cache else None,
+    }
+    return df, info
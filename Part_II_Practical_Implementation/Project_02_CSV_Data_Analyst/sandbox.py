@@ -0,0 +1,230 @@
+import atexit
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+
+from data_loader import map_arrow, private_copy
+
+# Largest DataFrame/Series result sent back to the app
+MAX_RESULT_ROWS = 10_000
+MAX_TEXT_CHARS = 20_000
+
+# Results travel as bytes with a one-byte tag, never as pickles: unpickling
+# data produced by generated code would let it run code in the app process.
+_FRAME, _SERIES, _JSON, _TEXT, _ERROR, _FATAL, _READY = b"F", b"S", b"J", b"T", b"E", b"X", b"R"
+
+def _memory_in_use_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmData:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def _limit_memory(memory_mb):
+    """Caps the worker's heap growth at `memory_mb` MB on top of what it already uses (Linux)."""
+    try:
+        import resource
+        limit = int((_memory_in_use_mb() + memory_mb) * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    except (ImportError, OSError, ValueError):
+        pass  # not supported on this platform: only the wall-clock limit applies
+
+def _arrow_bytes(frame):
+    table = pa.Table.from_pandas(frame.head(MAX_RESULT_ROWS))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _to_builtin(value):
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError
+
+def encode_result(value):
+    try:
+        if isinstance(value, pd.Series):
+            name = "value" if value.name is None else str(value.name)
+            return _SERIES + _arrow_bytes(value.to_frame(name=name))
+        if isinstance(value, pd.DataFrame):
+            frame = value.copy(deep=False)
+            frame.columns = [str(c) for c in frame.columns]
+            return _FRAME + _arrow_bytes(frame)
+        return _JSON + json.dumps(value, default=_to_builtin).encode()
+    except (TypeError, ValueError, pa.ArrowException):
+        return _TEXT + repr(value)[:MAX_TEXT_CHARS].encode()
+
+def decode_result(payload):
+    """Returns (ok, value); value is the error message when ok is False."""
+    tag, body = payload[:1], payload[1:]
+    if tag in (_FRAME, _SERIES):
+        frame = pa.ipc.open_stream(body).read_all().to_pandas()
+        return True, frame.iloc[:, 0] if tag == _SERIES else frame
+    if tag == _JSON:
+        return True, json.loads(body)
+    if tag == _TEXT:
+        return True, body.decode()
+    return False, body.decode()
+
+def _worker_main(conn, arrow_path, memory_mb):
+    """Loads the dataset once, then executes code snippets until the pipe closes."""
+    df = map_arrow(arrow_path)
+    _limit_memory(memory_mb)
+    conn.send_bytes(_READY)
+    while True:
+        try:
+            code = conn.recv_bytes().decode()
+        except EOFError:
+            return
+        local_vars = {"df": private_copy(df), "pd": pd}  # the next run sees the data unchanged
+        try:
+            exec(code, {}, local_vars)
+            payload = encode_result(local_vars.get("result", "No result variable found in code."))
+        except MemoryError:
+            conn.send_bytes(_FATAL + b"Out of memory (the worker's memory limit was reached)")
+            os._exit(1)  # the pool replaces this worker
+        except Exception as e:
+            payload = _ERROR + str(e).encode()
+        del local_vars
+        conn.send_bytes(payload)
+
+class _Worker:
+    def __init__(self, ctx, arrow_path, memory_mb):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, arrow_path, memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+class SandboxPool:
+    """
+    Pre-started worker processes that run generated pandas code against one dataset.
+
+    Every worker loads the dataset from its Arrow cache file (see data_loader.py),
+    so nothing is pickled per call. String columns stay views of the mapped file,
+    whose pages the OS shares between workers; numeric columns and categorical
+    codes are copied into each worker, so that part of the dataset takes
+    `workers` times its size. A run is bounded by `timeout` seconds and each
+    worker's heap by `memory_mb`; a worker that times out or dies is killed and
+    replaced.
+
+    `run` may be called from several threads. After `close`, it raises RuntimeError.
+    """
+
+    def __init__(self, arrow_path, workers=2, timeout=30.0, memory_mb=2048, startup_timeout=120.0,
+                 start_method="spawn"):
+        self.arrow_path = str(arrow_path)
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.startup_timeout = startup_timeout
+        self.stats = {"runs": 0, "errors": 0, "timeouts": 0, "crashes": 0}
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()  # guards stats, _closed and returning workers to _idle
+        for _ in range(workers):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        return _Worker(self._ctx, self.arrow_path, self.memory_mb)
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _release(self, worker):
+        with self._lock:
+            if not self._closed:
+                self._idle.put(worker)
+                return
+        worker.kill()
+
+    def _replace(self, worker):
+        worker.kill()
+        if not self._closed:
+            self._release(self._spawn())
+
+    def _acquire(self):
+        # Polls so callers waiting for a busy worker notice close()
+        while not self._closed:
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                pass
+        raise RuntimeError("SandboxPool is closed")
+
+    def run(self, code):
+        """Executes `code` in a worker; returns (ok, result or error message)."""
+        worker = self._acquire()
+        self._count("runs")
+        try:
+            if not worker.ready:
+                if not worker.conn.poll(self.startup_timeout) or worker.conn.recv_bytes() != _READY:
+                    raise EOFError
+                worker.ready = True
+            worker.conn.send_bytes(code.encode())
+            if not worker.conn.poll(self.timeout):
+                self._count("timeouts")
+                self._replace(worker)
+                return False, f"Execution timed out after {self.timeout:g}s"
+            payload = worker.conn.recv_bytes()
+        except (EOFError, OSError):
+            self._count("crashes")
+            self._replace(worker)
+            return False, "The worker process crashed (probably out of memory)"
+
+        if payload[:1] == _FATAL:
+            # It reported a MemoryError and is exiting
+            self._count("crashes")
+            self._replace(worker)
+        else:
+            self._release(worker)
+        ok, value = decode_result(payload)
+        if not ok:
+            self._count("errors")
+        return ok, value
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.kill()
+
+_pools = OrderedDict()
+_pools_lock = threading.Lock()
+
+def get_pool(arrow_path, max_pools=2, **options):
+    """The shared pool for a dataset; least recently used pools beyond `max_pools` are shut down."""
+    key = str(arrow_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SandboxPool(key, **options)
+        _pools.move_to_end(key)
+        while len(_pools) > max_pools:
+            _pools.popitem(last=False)[1].close()
+    return pool
+
+@atexit.register
+def _close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -1,29 +1,93 @@
+import sys
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
 import pandas as pd
-from groq import Groq
 import io
 
-def execute_pandas_code(df, query, api_key):
+# Shared LLM clients live one level up (Part_II_Practical_Implementation/llm_clients.py)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from llm_clients import get_llm
+from data_loader import private_copy
+
+def dataframe_fingerprint(df):
     """
-    1. Sends the Dataframe schema + User query to Groq.
-    2. Receives Python code (Pandas).
-    3. Executes the code and returns the result.
+    Identifies a DataFrame by its schema (column names + dtypes) and a digest of its content.
+    Compute it once per uploaded file and pass it to `execute_pandas_code`.
     """
-    client = Groq(api_key=api_key)
+    digest = hashlib.sha256()
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    except TypeError:
+        # Unhashable cells (lists, dicts): fall back to the text representation
+        digest.update(df.to_csv().encode())
+    return digest.hexdigest()[:16]
+
+def normalize_query(query):
+    """'  What is the AVERAGE salary? ' and 'what is the average salary' share a cache entry."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?.!").strip().lower()
+
+class _LRU:
+    """A small thread-safe LRU dict with hit/miss counters (Streamlit serves sessions from threads)."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
 
-    # 1. Prepare Context (Schema)
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+# Process-wide: every session asking about the same file shares them
+schema_prompts = _LRU(max_entries=64)   # fingerprint -> system prompt
+generated_code = _LRU(max_entries=2048)  # (fingerprint, normalized query) -> code that ran without errors
+
+def cache_stats():
+    return {"schema_prompt": schema_prompts.stats(), "code": generated_code.stats()}
+
+def build_system_prompt(df):
     columns = list(df.columns)
     sample_data = df.head(2).to_string()
-    
-    system_prompt = f"""
+
+    return f"""
     You are a Python expert specializing in Data Analysis with Pandas.
     You are given a pandas DataFrame named `df`.
-    
+
     Columns: {columns}
     Sample Data:
     {sample_data}
-    
+
     Your task: Write a snippet of Python code to answer the user's question.
-    
+
     RULES:
     1. Assume the dataframe `df` is already loaded.
     2. The code must store the final result in a variable named `result`.
@@ -31,40 +95,69 @@ def execute_pandas_code(df, query, api_key):
     4. RETURN ONLY THE CODE. No markdown, no comments, no ```python``` tags. Just the code.
     """
 
-    # 2. Get Code from LLM
-    try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": query}
-            ],
-            temperature=0, # Deterministic for code
-            stop=None
-        )
-        
-        generated_code = completion.choices[0].message.content
-        
-        # Clean up code (sometimes LLMs still add markdown)
-        generated_code = generated_code.replace("```python", "").replace("```", "").strip()
+def execute_pandas_code(df, query, api_key, fingerprint=None, sandbox=None):
+    """
+    1. Sends the Dataframe schema + User query to Groq.
+    2. Receives Python code (Pandas).
+    3. Executes the code and returns the result.
 
-    except Exception as e:
-        return f"Error connecting to Groq: {e}", None
+    Code that ran successfully is cached per (dataframe fingerprint, normalized query),
+    so a repeated question is answered by re-running it without an LLM round trip.
+    With a `sandbox` (sandbox.SandboxPool) the code runs in a worker process with
+    time and memory limits instead of in this process.
+    """
+    fingerprint = fingerprint or dataframe_fingerprint(df)
+    code_key = (fingerprint, normalize_query(query))
+    code = generated_code.get(code_key)
+
+    if code is None:
+        # 1. Prepare Context (Schema), rendered once per dataframe
+        system_prompt = schema_prompts.get(fingerprint)
+        if system_prompt is None:
+            system_prompt = build_system_prompt(df)
+            schema_prompts.put(fingerprint, system_prompt)
+
+        # 2. Get Code from LLM
+        try:
+            code = get_llm(api_key).complete(
+                model="llama-3.3-70b-versatile",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": query}
+                ],
+                temperature=0, # Deterministic for code
+                stop=None
+            )
+
+            # Clean up code (sometimes LLMs still add markdown)
+            code = code.replace("```python", "").replace("```", "").strip()
+
+        except Exception as e:
+            return f"Error connecting to Groq: {e}", None
 
     # 3. Execute Code safely
+    if sandbox is not None:
+        ok, result = sandbox.run(code)
+        if not ok:
+            return f"Error executing code: {result}\nGenerated Code was:\n{code}", code
+        generated_code.put(code_key, code)
+        return result, code
+
     # We create a local dictionary to store variables created by the exec()
-    local_vars = {"df": df, "pd": pd}
-    
+    # The dataframe is shared through st.cache_resource: the code gets a copy it may modify
+    local_vars = {"df": private_copy(df), "pd": pd}
+
     try:
-        exec(generated_code, {}, local_vars)
-        
+        exec(code, {}, local_vars)
+
         # Capture text result
         result = local_vars.get("result", "No result variable found in code.")
-        
+
         # Capture plot if it exists (optional enhancement)
         # For simplicity, we stick to text/tables first, but you can inspect local_vars for 'plt'
-        
-        return result, generated_code
+
+        generated_code.put(code_key, code)
+        return result, code
 
     except Exception as e:
-        return f"Error executing code: {e}\nGenerated Code was:\n{generated_code}", generated_code
+        return f"Error executing code: {e}\nGenerated Code was:\n{code}", code
@@ -1,13 +1,18 @@
-import os
+import sys
+from pathlib import Path
+
 import streamlit as st
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_groq import ChatGroq
 # Importación directa desde langchain.chains
 from langchain.chains import RetrievalQA
 
+# Shared LLM clients live one level up (Part_II_Practical_Implementation/llm_clients.py)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from llm_clients import get_chat_model
+from ingestion import EMBEDDING_MODEL, EmbeddingCache, IngestionJob, content_hash
+from retrieval import CrossEncoderReranker, HybridRetriever
+from index_manager import IndexManager
+
 # Configuración de página
 st.set_page_config(page_title="PDF RAG Brain", page_icon="🧠")
 
@@ -25,50 +30,75 @@ with st.sidebar:
     else:
         groq_api_key = st.text_input("Groq API Key", type="password")
     
+    # Espacio de trabajo: qué documentos indexados ve este usuario
+    workspace = st.text_input("Workspace", value="default")
+
+    st.markdown("---")
+    # Recuperación: BM25 + FAISS, re-ranking opcional y tope de contexto en el prompt
+    use_reranker = st.toggle("Re-rank with a cross-encoder", value=False,
+                             help="More precise answers; adds a small CPU model (downloaded on first use).")
+    context_budget = st.slider("Context budget (tokens)", min_value=300, max_value=4000, value=1500, step=100)
+
     st.markdown("---")
     st.info("This app runs locally using HuggingFace embeddings for privacy and zero cost.")
 
 # --- 2. FUNCIONES DE BACKEND ---
 @st.cache_resource
-def get_vectorstore(file_path):
+def get_embedding_cache():
     """
-    Procesa el PDF y crea la base de datos vectorial (FAISS).
-    Usa @st.cache_resource para no recalcular si el archivo es el mismo.
+    Modelo de embeddings (se carga una sola vez) + caché de embeddings por chunk en disco.
+    Usamos un modelo pequeño y rápido: all-MiniLM-L6-v2
     """
-    # A. Cargar PDF
-    loader = PyPDFLoader(file_path)
-    documents = loader.load()
-    
-    # B. Dividir texto (Chunks)
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200
-    )
-    chunks = text_splitter.split_documents(documents)
-    
-    # C. Crear Embeddings (Gratis / Local)
-    # Usamos un modelo pequeño y rápido: all-MiniLM-L6-v2
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    
-    # D. Crear Vector Store
-    vectorstore = FAISS.from_documents(chunks, embeddings)
-    return vectorstore
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    return EmbeddingCache(embeddings, model_name=EMBEDDING_MODEL)
+
+@st.cache_resource
+def get_index_manager():
+    """Índices de todos los documentos: en disco, y los más usados en memoria (LRU con límite de bytes)."""
+    return IndexManager(get_embedding_cache().embeddings, model_name=EMBEDDING_MODEL)
+
+@st.cache_resource
+def start_ingestion(doc_hash, _file_bytes, file_name):
+    """
+    Procesa el PDF y crea la base de datos vectorial (FAISS) en segundo plano.
+    La clave de caché es el hash del contenido (no la ruta del archivo): otro PDF
+    nunca reutiliza un índice ajeno. Al terminar, el índice pasa al IndexManager.
+    """
+    manager = get_index_manager()
+    return IngestionJob(_file_bytes, get_embedding_cache(), file_name=file_name,
+                        on_done=lambda vectorstore, stats: manager.put(stats["doc_hash"], vectorstore))
 
-def get_rag_chain(vectorstore, api_key):
+@st.fragment(run_every=1.0)
+def show_progress(job, queryable):
+    """
+    Solo este fragmento se refresca mientras avanza la ingesta. Recarga la app entera
+    cuando aparece el primer lote indexado (para mostrar el chat) y al terminar.
+    """
+    if job.done or (job.vectorstore is not None and not queryable):
+        st.rerun()
+    progress = job.progress
+    pages, pages_done = progress.get("pages", 0), progress.get("pages_done", 0)
+    st.progress(pages_done / pages if pages else 0.0,
+                text=f"🧠 Processing document: {pages_done}/{pages or '?'} pages, "
+                     f"{progress.get('chunks', 0)} chunks indexed ({progress.get('seconds', 0):.0f}s)")
+    if job.vectorstore is not None:
+        st.caption("You can already ask questions: answers use the pages indexed so far.")
+
+@st.cache_resource
+def get_reranker():
+    return CrossEncoderReranker()
+
+def get_rag_chain(retriever, api_key):
     """
     Crea la cadena de RAG usando Groq como LLM.
     """
-    # ⚠️  Usamos el modelo actualizado Llama 3.3
-    llm = ChatGroq(
-        groq_api_key=api_key, 
-        model_name="llama-3.3-70b-versatile",
-        temperature=0
-    )
-    
+    # ⚠️  Usamos el modelo actualizado Llama 3.3 (cliente compartido entre reruns)
+    llm = get_chat_model(api_key, "llama-3.3-70b-versatile", temperature=0)
+
     qa_chain = RetrievalQA.from_chain_type(
         llm=llm,
         chain_type="stuff",
-        retriever=vectorstore.as_retriever()
+        retriever=retriever
     )
     return qa_chain
 
@@ -81,23 +111,64 @@ if "messages" not in st.session_state:
 # Subida de archivo
 uploaded_file = st.file_uploader("Upload your PDF Document", type="pdf")
 
-if uploaded_file and groq_api_key:
-    # Guardar archivo temporalmente
-    temp_file = "./temp.pdf"
-    with open(temp_file, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-        
+if groq_api_key:
+    manager = get_index_manager()
+    # Híbrido: palabras clave (BM25) + semántica (FAISS), con el contexto limitado a `context_budget` tokens
+    retrieval_options = {"reranker": get_reranker() if use_reranker else None, "token_budget": context_budget}
+
     try:
-        with st.spinner("🧠 Processing document (Embedding)..."):
-            # Crear Base de Datos Vectorial
-            vectorstore = get_vectorstore(temp_file)
-            # Crear Cadena de RAG
-            qa_chain = get_rag_chain(vectorstore, groq_api_key)
-            st.success("Document processed! Ask questions below.")
-            
-        # Borrar archivo temporal (limpieza)
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+        qa_chain = None
+        doc_hash = None
+
+        if uploaded_file:
+            file_bytes = uploaded_file.getvalue()
+            doc_hash = content_hash(file_bytes)
+            # Crear Base de Datos Vectorial (identificada por el contenido del PDF), salvo si ya existe
+            jobs = st.session_state.setdefault("ingestion_jobs", {})
+            if doc_hash not in jobs and not manager.exists(doc_hash):
+                jobs[doc_hash] = start_ingestion(doc_hash, file_bytes, uploaded_file.name)
+            job = jobs.get(doc_hash)
+
+            if job is not None and not job.done:
+                show_progress(job, queryable=job.vectorstore is not None)
+                # El índice sigue creciendo mientras la ingesta avanza
+                if job.vectorstore is not None:
+                    qa_chain = get_rag_chain(HybridRetriever(vectorstore=job.vectorstore, **retrieval_options),
+                                             groq_api_key)
+                doc_hash = None  # aún no está en disco: no se puede seleccionar con los demás
+            elif job is not None and job.error is not None:
+                del jobs[doc_hash]
+                # Solo se descarta el trabajo de este PDF: el siguiente intento lo vuelve a procesar
+                start_ingestion.clear(doc_hash, file_bytes, uploaded_file.name)
+                raise job.error
+            else:
+                manager.add_to_workspace(doc_hash, workspace)
+                st.success("Document processed! Ask questions below.")
+                if job is None:
+                    st.caption("Index already on disk: nothing to embed.")
+                else:
+                    ingest_stats = job.stats
+                    st.caption(f"{ingest_stats['pages']} pages, {ingest_stats['chunks']} chunks in "
+                               f"{ingest_stats['seconds']:.1f}s: {ingest_stats['embedded']} embedded, "
+                               f"{ingest_stats['reused']} reused from the embedding cache.")
+
+        # Documentos a consultar (los del espacio de trabajo) y uso de memoria de los índices
+        with st.sidebar:
+            st.markdown("---")
+            documents = {meta["doc_hash"]: meta for meta in manager.list_documents(workspace)}
+            selected = st.multiselect(
+                "Documents to search", options=list(documents),
+                default=[doc_hash] if doc_hash in documents else [],
+                format_func=lambda h: f"{documents[h]['file_name']} ({documents[h].get('chunks', '?')} chunks)",
+            )
+            memory = manager.memory_stats()
+            st.caption(f"Indexes in memory: {memory['indexes_loaded']} · {memory['memory_mb']:.0f}/"
+                       f"{memory['max_memory_mb']:.0f} MB · loads {memory['loads']} · hits {memory['hits']} · "
+                       f"evictions {memory['evictions']}")
+
+        # Crear Cadena de RAG sobre los documentos elegidos (top-k conjunto)
+        if qa_chain is None and selected:
+            qa_chain = get_rag_chain(manager.as_retriever(selected, **retrieval_options), groq_api_key)
 
         # Mostrar historial de chat
         for message in st.session_state.messages:
@@ -105,7 +176,7 @@ if uploaded_file and groq_api_key:
                 st.markdown(message["content"])
 
         # Input de usuario
-        if prompt := st.chat_input("Ask something about the PDF..."):
+        if qa_chain is not None and (prompt := st.chat_input("Ask something about your documents...")):
             st.session_state.messages.append({"role": "user", "content": prompt})
             with st.chat_message("user"):
                 st.markdown(prompt)
@@ -121,5 +192,5 @@ if uploaded_file and groq_api_key:
     except Exception as e:
         st.error(f"Error: {e}")
 
-elif not groq_api_key:
+else:
     st.warning("Please enter your Groq API Key in the sidebar.")
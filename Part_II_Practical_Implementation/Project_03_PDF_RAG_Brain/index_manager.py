@@ -0,0 +1,204 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from ingestion import EMBEDDING_MODEL, INDEX_DIR, IncrementalFAISS, index_path
+from retrieval import reciprocal_rank_fusion, select_documents
+
+# Memoria máxima para índices cargados (se puede cambiar con RAG_INDEX_MEMORY_MB)
+MAX_INDEX_MB = int(os.environ.get("RAG_INDEX_MEMORY_MB", 1024))
+
+
+# Memoria por chunk además de los vectores (medido con tracemalloc tras load_local:
+# ~2.4 bytes por carácter y ~0.9 KB fijos; redondeado hacia arriba)
+BYTES_PER_CHAR = 3
+BYTES_PER_CHUNK = 1024
+
+
+def estimate_index_bytes(vectorstore):
+    """Memoria aproximada de un índice cargado: vectores float32 + docstore + postings de BM25."""
+    chunks = vectorstore.index.ntotal
+    text = sum(len(document.page_content) for document in vectorstore.documents(range(chunks)))
+    return chunks * (vectorstore.index.d * 4 + BYTES_PER_CHUNK) + BYTES_PER_CHAR * text
+
+
+class IndexManager:
+    """
+    Muchos índices por documento en disco (ingestion.build_vectorstore los guarda por hash
+    de contenido) y un pool en memoria con límite de bytes:
+
+    - los índices se cargan al primer uso y se quedan en un LRU;
+    - cuando la memoria estimada supera `max_bytes` se descartan los menos usados
+      (siguen en disco y se recargan si se vuelven a pedir);
+    - `search` consulta a la vez un conjunto de documentos y fusiona su top-k.
+
+    Es compartido por todas las sesiones: como los índices se identifican por su
+    contenido, dos usuarios con el mismo PDF usan el mismo índice. Qué documentos ve
+    cada uno lo deciden los espacios de trabajo (`add_to_workspace`).
+    """
+
+    def __init__(self, embeddings, model_name=EMBEDDING_MODEL, index_dir=INDEX_DIR, max_bytes=MAX_INDEX_MB << 20):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.index_dir = Path(index_dir)
+        self.max_bytes = max_bytes
+        self.counters = {"hits": 0, "loads": 0, "evictions": 0, "load_seconds": 0.0}
+        self._pool = OrderedDict()  # doc_hash -> (vectorstore, bytes estimados)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading = {}  # doc_hash -> lock: dos sesiones no cargan el mismo índice a la vez
+
+    def _path(self, doc_hash):
+        return index_path(doc_hash, self.model_name, self.index_dir)
+
+    def exists(self, doc_hash):
+        return (self._path(doc_hash) / "index.faiss").exists()
+
+    def _read_meta(self, doc_hash):
+        path = self._path(doc_hash)
+        try:
+            return json.loads((path / "meta.json").read_text())
+        except (OSError, ValueError):
+            return {"doc_hash": doc_hash, "file_name": doc_hash[:12], "created": path.stat().st_mtime}
+
+    def list_documents(self, workspace=None):
+        """
+        Fichas (meta.json) de los documentos indexados en disco, del más reciente al más
+        antiguo; con `workspace`, solo los que se han añadido a ese espacio de trabajo.
+        """
+        with self._lock:
+            loaded = set(self._pool)
+        documents = []
+        prefix = f"{self.model_name}-"
+        for path in self.index_dir.glob(f"{prefix}*"):
+            if not (path / "index.faiss").exists():
+                continue
+            meta = self._read_meta(path.name[len(prefix):])
+            if workspace is not None and workspace not in meta.get("workspaces", []):
+                continue
+            meta["loaded"] = meta["doc_hash"] in loaded
+            documents.append(meta)
+        return sorted(documents, key=lambda meta: meta.get("created", 0), reverse=True)
+
+    def add_to_workspace(self, doc_hash, workspace):
+        """
+        Hace visible un documento en un espacio de trabajo (un usuario o un equipo). El índice
+        no se duplica: si dos espacios suben el mismo PDF, ambos usan el mismo.
+        """
+        with self._lock:
+            meta = self._read_meta(doc_hash)
+            if workspace in meta.get("workspaces", []):
+                return
+            meta["workspaces"] = meta.get("workspaces", []) + [workspace]
+            tmp_path = self._path(doc_hash) / f"meta.json.{os.getpid()}.tmp"
+            tmp_path.write_text(json.dumps(meta))
+            os.replace(tmp_path, self._path(doc_hash) / "meta.json")
+
+    def put(self, doc_hash, vectorstore):
+        """Añade al pool un índice recién construido (p. ej. el on_done de un IngestionJob)."""
+        size = estimate_index_bytes(vectorstore)
+        with self._lock:
+            if doc_hash in self._pool:
+                self._bytes -= self._pool[doc_hash][1]
+            self._pool[doc_hash] = (vectorstore, size)
+            self._pool.move_to_end(doc_hash)
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        # El índice recién usado (el último) se queda aunque él solo supere el límite
+        while self._bytes > self.max_bytes and len(self._pool) > 1:
+            _, (_, size) = self._pool.popitem(last=False)
+            self._bytes -= size
+            self.counters["evictions"] += 1
+
+    def get(self, doc_hash):
+        """El índice de un documento, cargándolo desde disco si no está en memoria."""
+        with self._lock:
+            entry = self._pool.get(doc_hash)
+            if entry is not None:
+                self._pool.move_to_end(doc_hash)
+                self.counters["hits"] += 1
+                return entry[0]
+            loading = self._loading.setdefault(doc_hash, threading.Lock())
+
+        try:
+            with loading:
+                with self._lock:
+                    entry = self._pool.get(doc_hash)
+                    if entry is not None:  # otra sesión lo cargó mientras esperábamos
+                        self.counters["hits"] += 1
+                        return entry[0]
+                if not self.exists(doc_hash):
+                    raise KeyError(f"No index on disk for document {doc_hash}")
+                start = time.perf_counter()
+                # Índice escrito por nosotros mismos: es seguro deserializarlo
+                vectorstore = IncrementalFAISS.load_local(str(self._path(doc_hash)), self.embeddings,
+                                                          allow_dangerous_deserialization=True)
+                with self._lock:
+                    self.counters["loads"] += 1
+                    self.counters["load_seconds"] += time.perf_counter() - start
+                self.put(doc_hash, vectorstore)
+                return vectorstore
+        finally:
+            # También si la carga falla o no existe el índice: si no, _loading crece sin límite
+            with self._lock:
+                if self._loading.get(doc_hash) is loading:
+                    self._loading.pop(doc_hash)
+
+    def search(self, query, doc_hashes, k=4, fetch_k=20, rrf_k=60, reranker=None, token_budget=None):
+        """
+        Top-k conjunto de varios documentos. Las distancias de FAISS (mismo modelo de
+        embeddings) y los scores BM25 se ordenan juntos para todos los índices, y las dos
+        listas globales se fusionan con RRF. El embedding de la consulta se calcula una vez.
+        """
+        query_vector = self.embeddings.embed_query(query)
+        indexes = {doc_hash: self.get(doc_hash) for doc_hash in doc_hashes}
+        dense, sparse = [], []
+        for doc_hash, vectorstore in indexes.items():
+            dense += [(distance, (doc_hash, position))
+                      for position, distance in vectorstore.dense_search(query, fetch_k, query_vector)]
+            sparse += [(score, (doc_hash, position)) for position, score in vectorstore.sparse_search(query, fetch_k)]
+        dense.sort(key=lambda item: item[0])
+        sparse.sort(key=lambda item: item[0], reverse=True)
+        fused = reciprocal_rank_fusion([[key for _, key in dense[:fetch_k]], [key for _, key in sparse[:fetch_k]]],
+                                       rrf_k)
+
+        keys = [key for key, _ in fused[:fetch_k if reranker else k]]
+        documents = [indexes[doc_hash].documents([position])[0] for doc_hash, position in keys]
+        return select_documents(query, documents, k, reranker, token_budget)
+
+    def as_retriever(self, doc_hashes, **options):
+        return MultiIndexRetriever(manager=self, doc_hashes=list(doc_hashes), **options)
+
+    def memory_stats(self):
+        with self._lock:
+            return {
+                "indexes_loaded": len(self._pool),
+                "memory_mb": self._bytes / 2**20,
+                "max_memory_mb": self.max_bytes / 2**20,
+                **self.counters,
+            }
+
+
+class MultiIndexRetriever(BaseRetriever):
+    """Retriever de LangChain sobre un conjunto de documentos de un IndexManager."""
+
+    manager: Any
+    doc_hashes: List[str]
+    k: int = 4
+    fetch_k: int = 20
+    rrf_k: int = 60
+    reranker: Optional[Any] = None
+    token_budget: Optional[int] = 1500
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return self.manager.search(query, self.doc_hashes, self.k, self.fetch_k, self.rrf_k,
+                                   self.reranker, self.token_budget)
@@ -0,0 +1,381 @@
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pypdf import PdfReader
+
+from retrieval import BM25Index
+
+# Caché en disco: embeddings por chunk + un índice FAISS por documento
+CACHE_DIR = Path(os.environ.get("RAG_CACHE_DIR", Path(__file__).resolve().parent / ".rag_cache"))
+INDEX_DIR = CACHE_DIR / "indexes"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Pipeline de ingesta
+PDF_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+PAGES_PER_TASK = 16
+EMBED_BATCH_SIZE = 64
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def index_path(doc_hash, model_name=EMBEDDING_MODEL, index_dir=INDEX_DIR) -> Path:
+    """Carpeta del índice FAISS de un documento (index.faiss + index.pkl + meta.json)."""
+    return Path(index_dir) / f"{model_name}-{doc_hash}"
+
+
+class EmbeddingCache:
+    """
+    Embeddings de chunks guardados en SQLite, con clave = hash(modelo + texto del chunk).
+    Un PDF re-subido con pequeños cambios solo embebe los chunks nuevos o modificados.
+    """
+
+    def __init__(self, embeddings, model_name=EMBEDDING_MODEL, path=CACHE_DIR / "embeddings.sqlite"):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+        self._lock = threading.Lock()
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode()).hexdigest()
+
+    def embed_documents(self, texts):
+        """Devuelve (vectores, stats) reutilizando los embeddings ya calculados."""
+        keys = [self._key(text) for text in texts]
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._db.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch)
+                found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+
+        missing = {}  # key -> texto (los chunks repetidos se embeben una sola vez)
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, vectors)}
+            with self._lock, self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in new.items()],
+                )
+            found.update(new)
+
+        stats = {"chunks": len(texts), "embedded": len(missing), "reused": sum(key not in missing for key in keys)}
+        return [found[key].tolist() for key in keys], stats
+
+
+class IncrementalFAISS(FAISS):
+    """
+    FAISS que se puede consultar mientras la ingesta sigue añadiendo chunks:
+    las altas y las búsquedas comparten un lock.
+
+    Mantiene además un índice BM25 (retrieval.BM25Index) con los mismos chunks en
+    el mismo orden, para la recuperación híbrida de retrieval.HybridRetriever.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.RLock()
+        self.sparse = BM25Index()
+        self._sync_sparse()  # índices recargados con load_local
+
+    def _sync_sparse(self):
+        """Indexa en BM25 los chunks que FAISS tiene y BM25 todavía no."""
+        with self._lock:
+            start = len(self.sparse)
+            if start < len(self.index_to_docstore_id):
+                self.sparse.add([self.docstore.search(self.index_to_docstore_id[position]).page_content
+                                 for position in range(start, len(self.index_to_docstore_id))])
+
+    def add_embeddings(self, *args, **kwargs):
+        with self._lock:
+            ids = super().add_embeddings(*args, **kwargs)
+            self._sync_sparse()
+            return ids
+
+    def similarity_search_with_score_by_vector(self, *args, **kwargs):
+        with self._lock:
+            return super().similarity_search_with_score_by_vector(*args, **kwargs)
+
+    def max_marginal_relevance_search_with_score_by_vector(self, *args, **kwargs):
+        with self._lock:
+            return super().max_marginal_relevance_search_with_score_by_vector(*args, **kwargs)
+
+    def save_local(self, *args, **kwargs):
+        with self._lock:
+            return super().save_local(*args, **kwargs)
+
+    def dense_search(self, query, k=20, query_vector=None):
+        """[(posición, distancia)] de los `k` chunks más cercanos a la consulta (o a `query_vector`)."""
+        if query_vector is None:
+            query_vector = self._embed_query(query)
+        vector = np.asarray([query_vector], dtype=np.float32)
+        if self._normalize_L2:
+            faiss.normalize_L2(vector)
+        with self._lock:
+            scores, positions = self.index.search(vector, min(k, self.index.ntotal))
+        return [(int(position), float(score)) for position, score in zip(positions[0], scores[0]) if position != -1]
+
+    def sparse_search(self, query, k=20):
+        """[(posición, score BM25)] de los `k` chunks con más coincidencias de palabras clave."""
+        self._sync_sparse()
+        return self.sparse.search(query, k)
+
+    def documents(self, positions):
+        with self._lock:
+            return [self.docstore.search(self.index_to_docstore_id[position]) for position in positions]
+
+
+# --- Etapa 1: extracción de páginas (pool de procesos) ---
+_reader = None  # uno por proceso del pool
+
+def _open_pdf(path):
+    global _reader
+    _reader = PdfReader(path)
+
+def _extract_pages(start, stop, reader=None):
+    reader = reader or _reader
+    return [(number, reader.pages[number].extract_text()) for number in range(start, stop)]
+
+def iter_pages(path, workers=PDF_WORKERS, pages_per_task=PAGES_PER_TASK):
+    """
+    Devuelve (número de página, texto) en orden. Con `workers` > 0 las páginas se
+    extraen en un pool de procesos, con como mucho 2 * workers tareas en vuelo.
+    """
+    reader = PdfReader(path)
+    total = len(reader.pages)
+    ranges = [(start, min(start + pages_per_task, total)) for start in range(0, total, pages_per_task)]
+    if workers <= 0 or len(ranges) < 2:
+        for start, stop in ranges:
+            yield from _extract_pages(start, stop, reader)
+        return
+    del reader
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(min(workers, len(ranges)), mp_context=ctx,
+                             initializer=_open_pdf, initargs=(path,)) as pool:
+        pending = deque()
+        try:
+            for start, stop in ranges:
+                pending.append(pool.submit(_extract_pages, start, stop))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def page_count(data: bytes) -> int:
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+# --- Pipeline: páginas -> chunks -> embeddings -> índice ---
+_DONE = object()
+
+def _put(q, item, stop):
+    """put() bloqueante que se rinde si el consumidor ya no está."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def ingest_pdf(data: bytes, embedding_cache, file_name="document.pdf", workers=PDF_WORKERS,
+               batch_size=EMBED_BATCH_SIZE, max_pending=4):
+    """
+    Ingesta por etapas de un PDF, en streaming:
+
+    1. un pool de procesos extrae el texto de las páginas;
+    2. un hilo trocea cada página en cuanto llega y agrupa los chunks en lotes de `batch_size`;
+    3. otro hilo embebe cada lote (usando la caché de embeddings);
+    4. este generador añade cada lote al índice y devuelve el progreso.
+
+    Las colas entre etapas tienen como mucho `max_pending` lotes: nunca están todas
+    las páginas (ni todos los chunks pendientes de embeber) en memoria a la vez.
+    Cada valor devuelto es un dict con el progreso y el índice (`vectorstore`),
+    que ya se puede consultar con los chunks añadidos hasta ese momento.
+    """
+    started = time.perf_counter()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    chunk_batches, embedded_batches = queue.Queue(max_pending), queue.Queue(max_pending)
+    stop = threading.Event()
+    progress = {"pages": page_count(data), "pages_done": 0, "chunks": 0, "embedded": 0, "reused": 0}
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(data)
+
+    def chunk_pages():
+        batch = []
+        try:
+            for number, text in iter_pages(tmp.name, workers):
+                metadata = {"source": file_name, "page": number}
+                batch += [(chunk, metadata) for chunk in text_splitter.split_text(text)]
+                while len(batch) >= batch_size:
+                    # El lote cubre hasta la página anterior; esta aún tiene chunks pendientes
+                    if not _put(chunk_batches, (batch[:batch_size], number), stop):
+                        return
+                    batch = batch[batch_size:]
+            if batch:
+                _put(chunk_batches, (batch, progress["pages"]), stop)
+            _put(chunk_batches, _DONE, stop)
+        except BaseException as e:
+            _put(chunk_batches, e, stop)
+
+    def embed_batches():
+        while not stop.is_set():
+            try:
+                item = chunk_batches.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE or isinstance(item, BaseException):
+                _put(embedded_batches, item, stop)
+                return
+            batch, pages_done = item
+            try:
+                vectors, stats = embedding_cache.embed_documents([text for text, _ in batch])
+            except BaseException as e:
+                _put(embedded_batches, e, stop)
+                return
+            if not _put(embedded_batches, (batch, vectors, stats, pages_done), stop):
+                return
+
+    threads = [threading.Thread(target=chunk_pages, name="pdf-chunker", daemon=True),
+               threading.Thread(target=embed_batches, name="pdf-embedder", daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    vectorstore = None
+    try:
+        while True:
+            item = embedded_batches.get()
+            if item is _DONE:
+                # Si los chunks llenaron justo el último lote, ese lote solo cubría hasta la página anterior
+                if vectorstore is not None and progress["pages_done"] < progress["pages"]:
+                    progress["pages_done"] = progress["pages"]
+                    yield {**progress, "seconds": time.perf_counter() - started, "vectorstore": vectorstore}
+                break
+            if isinstance(item, BaseException):
+                raise item
+            batch, vectors, stats, pages_done = item
+            text_embeddings = [(text, vector) for (text, _), vector in zip(batch, vectors)]
+            metadatas = [dict(metadata) for _, metadata in batch]
+            if vectorstore is None:
+                vectorstore = IncrementalFAISS.from_embeddings(text_embeddings, embedding_cache.embeddings,
+                                                               metadatas=metadatas)
+            else:
+                vectorstore.add_embeddings(text_embeddings, metadatas=metadatas)
+            progress["chunks"] += len(batch)
+            progress["embedded"] += stats["embedded"]
+            progress["reused"] += stats["reused"]
+            progress["pages_done"] = pages_done
+            yield {**progress, "seconds": time.perf_counter() - started, "vectorstore": vectorstore}
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        os.remove(tmp.name)
+
+
+def build_vectorstore(data: bytes, embedding_cache, file_name="document.pdf", index_dir=INDEX_DIR,
+                      on_progress=None, **pipeline_options):
+    """
+    Devuelve (vectorstore, stats) para un PDF identificado por el hash de su contenido.
+
+    Si el índice FAISS de ese contenido ya existe en disco se recarga; si no, se
+    construye con `ingest_pdf` (embebiendo solo los chunks que no están en la caché)
+    y se persiste. `on_progress(progress)` se llama tras cada lote, y el índice que
+    recibe ya se puede consultar.
+    """
+    doc_hash = content_hash(data)
+    path = index_path(doc_hash, embedding_cache.model_name, index_dir)
+    if (path / "index.faiss").exists():
+        # Índice escrito por nosotros mismos: es seguro deserializarlo
+        vectorstore = IncrementalFAISS.load_local(str(path), embedding_cache.embeddings,
+                                                  allow_dangerous_deserialization=True)
+        return vectorstore, {"doc_hash": doc_hash, "source": "disk", "chunks": vectorstore.index.ntotal,
+                             "embedded": 0, "reused": vectorstore.index.ntotal}
+
+    vectorstore, stats = None, {"chunks": 0, "embedded": 0, "reused": 0}
+    for progress in ingest_pdf(data, embedding_cache, file_name, **pipeline_options):
+        vectorstore = progress.pop("vectorstore")
+        stats = progress
+        if on_progress is not None:
+            on_progress({**progress, "vectorstore": vectorstore})
+    if vectorstore is None:
+        raise ValueError("The PDF has no extractable text")
+    vectorstore.save_local(str(path))
+    # Ficha del documento para index_manager.IndexManager.list_documents
+    meta = {"doc_hash": doc_hash, "file_name": file_name, "pages": stats["pages"], "chunks": stats["chunks"],
+            "created": time.time()}
+    (path / "meta.json").write_text(json.dumps(meta))
+    return vectorstore, {"doc_hash": doc_hash, "source": "pdf", **stats}
+
+
+class IngestionJob:
+    """
+    Ejecuta `build_vectorstore` en un hilo en segundo plano. La interfaz lee
+    `progress` y puede consultar `vectorstore` antes de que termine la ingesta.
+
+    Con `on_done(vectorstore, stats)` el índice terminado se entrega (p. ej. a un
+    IndexManager) y el job deja de guardarlo, para que solo lo retenga quien lo recibe.
+    """
+
+    def __init__(self, data: bytes, embedding_cache, file_name="document.pdf", on_done=None, **options):
+        self.on_done = on_done
+        self.progress = {}
+        self.vectorstore = None
+        self.stats = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(data, embedding_cache, file_name, options),
+                                        name="pdf-ingestion", daemon=True)
+        self._thread.start()
+
+    def _on_progress(self, progress):
+        self.vectorstore = progress.pop("vectorstore")
+        self.progress = progress
+
+    def _run(self, data, embedding_cache, file_name, options):
+        try:
+            vectorstore, self.stats = build_vectorstore(data, embedding_cache, file_name,
+                                                        on_progress=self._on_progress, **options)
+            if self.on_done is not None:
+                self.on_done(vectorstore, self.stats)
+                vectorstore = None
+            self.vectorstore = vectorstore
+        except Exception as e:
+            self.error = e
+
+    @property
+    def done(self):
+        return not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.done
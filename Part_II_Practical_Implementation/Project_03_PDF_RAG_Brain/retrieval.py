@@ -0,0 +1,179 @@
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# Identificadores como "X-200.3", "4.2.1" o "ISO/IEC" se conservan enteros (y además por partes)
+_TOKEN = re.compile(r"\w+(?:[-./]\w+)*")
+_PART = re.compile(r"\w+")
+
+
+def tokenize(text):
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        tokens.append(token)
+        if not token.isalnum():
+            tokens += _PART.findall(token)
+    return tokens
+
+
+def estimate_tokens(text):
+    """Estimación rápida (~4 caracteres por token), sin descargar un tokenizer."""
+    return max(1, (len(text) + 3) // 4)
+
+
+class BM25Index:
+    """
+    Índice invertido BM25 que crece por lotes (en el mismo orden que el índice FAISS,
+    así que la posición de un chunk es la misma en los dos índices).
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(lambda: ([], []))  # término -> (posiciones, frecuencias)
+        self._lengths = []
+        self._total_length = 0
+        self._arrays = {}  # versión numpy de las posting lists, se invalida al añadir
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, texts):
+        with self._lock:
+            for text in texts:
+                position = len(self._lengths)
+                counts = defaultdict(int)
+                for token in tokenize(text):
+                    counts[token] += 1
+                for token, count in counts.items():
+                    positions, frequencies = self._postings[token]
+                    positions.append(position)
+                    frequencies.append(count)
+                length = sum(counts.values())
+                self._lengths.append(length)
+                self._total_length += length
+            self._arrays.clear()
+
+    def _posting_arrays(self, token):
+        arrays = self._arrays.get(token)
+        if arrays is None:
+            positions, frequencies = self._postings[token]
+            arrays = self._arrays[token] = (np.array(positions, dtype=np.int64),
+                                            np.array(frequencies, dtype=np.float32))
+        return arrays
+
+    def search(self, query, k=20):
+        """Devuelve [(posición, score)] de los `k` chunks con mayor BM25."""
+        with self._lock:
+            n = len(self._lengths)
+            terms = [token for token in set(tokenize(query)) if token in self._postings]
+            if not n or not terms:
+                return []
+            lengths = np.asarray(self._lengths, dtype=np.float32)
+            norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / n))
+            scores = np.zeros(n, dtype=np.float32)
+            for token in terms:
+                positions, frequencies = self._posting_arrays(token)
+                idf = math.log(1 + (n - len(positions) + 0.5) / (len(positions) + 0.5))
+                scores[positions] += idf * frequencies * (self.k1 + 1) / (frequencies + norm[positions])
+
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(position), float(scores[position])) for position in top if scores[position] > 0]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fusiona listas ordenadas de posiciones: [(posición, score)] con score = suma de 1 / (k + rango)."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, position in enumerate(ranking, start=1):
+            scores[position] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def hybrid_search(vectorstore, query, fetch_k=20, rrf_k=60, query_vector=None):
+    """[(posición, score RRF)] de la búsqueda híbrida en un ingestion.IncrementalFAISS."""
+    dense = [position for position, _ in vectorstore.dense_search(query, fetch_k, query_vector)]
+    sparse = [position for position, _ in vectorstore.sparse_search(query, fetch_k)]
+    return reciprocal_rank_fusion([dense, sparse], rrf_k)
+
+
+def select_documents(query, candidates, k, reranker=None, token_budget=None):
+    """Los `k` mejores candidatos (ya ordenados), re-ordenados si hay reranker y dentro del presupuesto."""
+    if reranker is not None:
+        candidates = reranker.rerank(query, candidates)
+    return pack_context(candidates[:k], token_budget)
+
+
+def pack_context(documents, token_budget):
+    """Los primeros documentos (por relevancia) que caben en `token_budget`; siempre al menos uno."""
+    if token_budget is None:
+        return documents
+    packed, used = [], 0
+    for document in documents:
+        cost = estimate_tokens(document.page_content)
+        if packed and used + cost > token_budget:
+            break
+        packed.append(document)
+        used += cost
+    return packed
+
+
+class CrossEncoderReranker:
+    """
+    Re-ranking con un cross-encoder pequeño en CPU (sentence-transformers).
+    El modelo se carga la primera vez que se usa.
+    """
+
+    def __init__(self, model_name="cross-encoder/ms-marco-MiniLM-L-6-v2", batch_size=32, max_length=512):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+                self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+        return self._model
+
+    def rerank(self, query, documents):
+        if not documents:
+            return documents
+        scores = self._load().predict([(query, document.page_content) for document in documents],
+                                      batch_size=self.batch_size)
+        order = np.argsort(-np.asarray(scores))
+        return [documents[i] for i in order]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Recuperación híbrida: BM25 (palabras clave, ids, números de pieza) + FAISS (semántica),
+    fusionadas por reciprocal rank fusion. Opcionalmente re-ordena los candidatos con un
+    cross-encoder y limita el contexto que se mete en el prompt a `token_budget` tokens.
+
+    `vectorstore` es un ingestion.IncrementalFAISS (mantiene el índice BM25 junto al de FAISS).
+    """
+
+    vectorstore: Any
+    k: int = 4
+    fetch_k: int = 20
+    rrf_k: int = 60
+    reranker: Optional[Any] = None
+    token_budget: Optional[int] = 1500
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        fused = hybrid_search(self.vectorstore, query, self.fetch_k, self.rrf_k)
+        positions = [position for position, _ in fused[:self.fetch_k if self.reranker else self.k]]
+        return select_documents(query, self.vectorstore.documents(positions), self.k,
+                                self.reranker, self.token_budget)
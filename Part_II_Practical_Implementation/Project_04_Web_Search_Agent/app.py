@@ -1,10 +1,16 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-from langchain_groq import ChatGroq
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.callbacks import StreamlitCallbackHandler
 
+# Shared LLM clients live one level up (Part_II_Practical_Implementation/llm_clients.py)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from llm_clients import get_chat_model
+
 st.set_page_config(page_title="Web Search Agent", page_icon="🌐")
 
 st.title("🌐 Project 04: Search Agent (Tool Calling)")
@@ -37,12 +43,8 @@ search_tool = TavilySearchResults(
 )
 tools = [search_tool]
 
-# LLM (Llama 3.3 es excelente para Tool Calling)
-llm = ChatGroq(
-    groq_api_key=groq_api_key, 
-    model_name="llama-3.3-70b-versatile", 
-    temperature=0
-)
+# LLM (Llama 3.3 es excelente para Tool Calling), compartido entre reruns
+llm = get_chat_model(groq_api_key, "llama-3.3-70b-versatile", temperature=0)
 
 # --- 3. CREAR EL AGENTE MODERNO ---
 
@@ -1,9 +1,15 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
 
+# Shared LLM clients live one level up (Part_II_Practical_Implementation/llm_clients.py)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from llm_clients import get_chat_model
+
 st.set_page_config(page_title="YouTube AI Assistant", page_icon="📺", layout="centered")
 
 st.title("📺 Project 05: YouTube Summarizer & Chat")
@@ -65,11 +71,7 @@ def get_transcript(video_id):
         return None 
 
 def analyze_video(text, action, api_key):
-    llm = ChatGroq(
-        groq_api_key=api_key, 
-        model_name="llama-3.3-70b-versatile",
-        temperature=0.3
-    )
+    llm = get_chat_model(api_key, "llama-3.3-70b-versatile", temperature=0.3)
 
     if action == "Summarize":
         template = """
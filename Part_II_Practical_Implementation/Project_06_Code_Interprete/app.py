@@ -1,12 +1,17 @@
 import streamlit as st
 import os
-from langchain_groq import ChatGroq
+import sys
+from pathlib import Path
 from langchain_core.tools import Tool
 from langchain_experimental.utilities import PythonREPL
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.callbacks import StreamlitCallbackHandler
 
+# Shared LLM clients live one level up (Part_II_Practical_Implementation/llm_clients.py)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from llm_clients import get_chat_model
+
 st.set_page_config(page_title="Python Code Interpreter", page_icon="🐍", layout="wide")
 
 st.title("🐍 Project 06: Python Code Interpreter")
@@ -55,11 +60,7 @@ repl_tool = Tool(
 tools = [repl_tool]
 
 # --- 3. AGENTE ---
-llm = ChatGroq(
-    groq_api_key=api_key, 
-    model_name="llama-3.3-70b-versatile",
-    temperature=0
-)
+llm = get_chat_model(api_key, "llama-3.3-70b-versatile", temperature=0)
 
 prompt = ChatPromptTemplate.from_messages([
     ("system", """You are a Python Data Scientist. 
@@ -1,5 +1,6 @@
 import streamlit as st
 import sys
+from pathlib import Path
 
 # 1. ESTO DEBE SER LA PRIMERA LÍNEA EJECUTABLE SIEMPRE
 st.set_page_config(page_title="AI Financial Analyst", page_icon="📈", layout="wide")
@@ -16,11 +17,14 @@ try:
     
     import yfinance as yf
     import pandas as pd
-    from langchain_groq import ChatGroq
     from langchain_core.prompts import ChatPromptTemplate
     from langchain.tools import tool
     from langchain.agents import AgentExecutor, create_tool_calling_agent
     from langchain.callbacks import StreamlitCallbackHandler
+
+    # Clientes LLM compartidos (Part_II_Practical_Implementation/llm_clients.py)
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from llm_clients import get_chat_model
     
     status_area.success("✅ Librerías cargadas correctamente.")
     status_area.empty() # Limpiamos los mensajes de carga
@@ -72,7 +76,7 @@ if not api_key:
     st.stop()
 
 # Configuración del Agente
-llm = ChatGroq(groq_api_key=api_key, model_name="llama-3.3-70b-versatile", temperature=0)
+llm = get_chat_model(api_key, "llama-3.3-70b-versatile", temperature=0)
 tools = [get_stock_info, get_historical_prices]
 
 prompt = ChatPromptTemplate.from_messages([
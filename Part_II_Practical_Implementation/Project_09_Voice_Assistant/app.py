@@ -1,9 +1,14 @@
 import streamlit as st
 import os
-from groq import Groq
+import sys
+from pathlib import Path
 from gtts import gTTS
 import tempfile
 
+# Shared LLM clients live one level up (Part_II_Practical_Implementation/llm_clients.py)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from llm_clients import get_llm
+
 # 1. CONFIGURACIÓN
 st.set_page_config(page_title="Voice Assistant", page_icon="🎙️")
 
@@ -21,7 +26,8 @@ if not api_key:
     st.warning("Please enter your Groq API Key.")
     st.stop()
 
-client = Groq(api_key=api_key)
+# Cliente Groq compartido (Whisper + chat), se reutiliza entre reruns
+client = get_llm(api_key, backend="groq").client
 
 # 3. FUNCIONES DE PROCESAMIENTO
 
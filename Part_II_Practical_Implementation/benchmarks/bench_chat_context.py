@@ -0,0 +1,76 @@
+# ==========================================
+# 🧠 Project 01: full chat history vs ChatContext (budget + rolling summary)
+# ==========================================
+# Run from Part_II_Practical_Implementation: `python benchmarks/bench_chat_context.py`
+# A synthetic 200-turn conversation; summaries come from the offline FakeLLM.
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Project_01_Simple_Chat_LLM"))
+from context_manager import MESSAGE_OVERHEAD, ChatContext, estimate_tokens, make_summarizer
+from llm_clients import FakeLLM
+
+WORDS = ("agent model token context memory budget latency python stream retrieval vector "
+         "summary prompt answer question groq llama window cache").split()
+
+
+def synthetic_turn(rng):
+    user = " ".join(rng.choices(WORDS, k=rng.randint(20, 80)))
+    assistant = " ".join(rng.choices(WORDS, k=rng.randint(100, 250)))
+    return {"role": "user", "content": user}, {"role": "assistant", "content": assistant}
+
+
+def full_history_tokens(messages):
+    """What app.py did before: every message, recounted every turn."""
+    return sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=3000)
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=50.0,
+                        help="modelled prompt processing time per 1k prompt tokens")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    summarizer = FakeLLM(latency=0.05, token_delay=0, reply=" ".join(["summary"] * 150))
+    context = ChatContext(budget=args.budget, summarize=make_summarizer(summarizer, "fake"))
+    messages = [{"role": "assistant", "content": "Hello! I am running on Llama 3. How can I help you?"}]
+    full, managed = [], []
+    full_cpu = managed_cpu = 0.0
+
+    print(f"{'turn':>6}{'full history':>15}{'ChatContext':>14}{'summarized msgs':>18}")
+    for turn in range(1, args.turns + 1):
+        user, assistant = synthetic_turn(rng)
+        messages.append(user)
+
+        start = time.perf_counter()
+        full.append(full_history_tokens(messages))
+        full_cpu += time.perf_counter() - start
+
+        start = time.perf_counter()
+        context.build(messages)
+        managed_cpu += time.perf_counter() - start
+        managed.append(context.stats["prompt_tokens"])
+
+        messages.append(assistant)
+        time.sleep(0.01)  # the reply streaming; summaries run meanwhile
+        if turn in (1, 10, 25, 50, 100, 150, 200) or turn == args.turns:
+            print(f"{turn:>6}{full[-1]:>15}{managed[-1]:>14}{context.stats['messages_summarized']:>18}")
+
+    prefill = args.prefill_ms_per_1k / 1000
+    print(f"\nprompt tokens over {args.turns} turns: {sum(full)} full vs {sum(managed)} managed "
+          f"({1 - sum(managed) / sum(full):.0%} fewer)")
+    print(f"modelled prompt latency per turn (last turn): {full[-1] * prefill:.0f} ms vs {managed[-1] * prefill:.0f} ms")
+    print(f"token counting CPU, all turns: {full_cpu * 1000:.1f} ms recounting vs {managed_cpu * 1000:.1f} ms cached")
+    print(f"background summaries: {summarizer.calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# ==========================================
+# 📊 Project 02: pd.read_csv vs chunked loading + Arrow cache
+# ==========================================
+# Run from Part_II_Practical_Implementation: `python benchmarks/bench_csv_loading.py --size-gb 2`
+# Each loader runs in a fresh subprocess so its peak RSS can be measured on its own.
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, "Project_02_CSV_Data_Analyst")
+
+LOADERS = {
+    "pd.read_csv (previous)": "import pandas as pd; df = pd.read_csv(open(PATH, 'rb'))",
+    "load_csv, first load": "from data_loader import load_csv; df, _ = load_csv(open(PATH, 'rb'), cache_dir=CACHE)",
+    "load_csv, Arrow cache": "from data_loader import load_csv; df, _ = load_csv(open(PATH, 'rb'), cache_dir=CACHE)",
+}
+
+
+def write_synthetic_csv(path, size_bytes, chunk_rows=500_000, seed=0):
+    """Sales-like rows: ids, small ints, prices, a few categories and free text."""
+    rng = np.random.default_rng(seed)
+    regions = np.array(["north", "south", "east", "west", "central"])
+    products = np.array([f"product_{i}" for i in range(200)])
+    first, rows = True, 0
+    with open(path, "w") as f:
+        while f.tell() < size_bytes:
+            n = chunk_rows
+            pd.DataFrame({
+                "order_id": np.arange(rows, rows + n),
+                "quantity": rng.integers(1, 50, n),
+                "price": rng.uniform(1, 500, n).round(2),
+                "region": regions[rng.integers(0, len(regions), n)],
+                "product": products[rng.integers(0, len(products), n)],
+                "customer": [f"customer_{i}" for i in rng.integers(0, 10_000_000, n)],
+            }).to_csv(f, index=False, header=first)
+            first, rows = False, rows + n
+    return rows
+
+
+def run_loader(code, path, cache_dir):
+    script = f"""
+import resource, sys, time
+sys.path.insert(0, {PROJECT!r}); sys.path.insert(0, {ROOT!r})
+PATH, CACHE = {path!r}, {cache_dir!r}
+start = time.perf_counter()
+{code}
+seconds = time.perf_counter() - start
+print(seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, df.memory_usage(deep=True).sum() / 1e6)
+"""
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    if out.returncode != 0:
+        return None
+    return [float(x) for x in out.stdout.split()]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-gb", type=float, default=2.0)
+    parser.add_argument("--skip-baseline", action="store_true", help="pd.read_csv may not fit in RAM")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sales.csv")
+        start = time.perf_counter()
+        rows = write_synthetic_csv(path, int(args.size_gb * 1e9))
+        print(f"{os.path.getsize(path) / 1e9:.2f} GB CSV, {rows:,} rows (written in {time.perf_counter() - start:.0f}s)")
+        print(f"{'loader':<26}{'seconds':>10}{'peak RSS MB':>14}{'DataFrame MB':>14}")
+        for name, code in LOADERS.items():
+            if args.skip_baseline and "previous" in name:
+                continue
+            result = run_loader(code, path, os.path.join(tmp, "cache"))
+            if result is None:
+                print(f"{name:<26}{'failed (out of memory?)':>38}")
+                continue
+            seconds, peak_mb, frame_mb = result
+            print(f"{name:<26}{seconds:>10.1f}{peak_mb:>14.0f}{frame_mb:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# ==========================================
+# 📊 Project 03: vector-only retriever vs hybrid BM25 + FAISS retrieval
+# ==========================================
+# Run from Part_II_Practical_Implementation: `python benchmarks/bench_hybrid_retrieval.py --chunks 20000`
+# Queries ask for part numbers / clause ids that appear in exactly one chunk. Embeddings are
+# fake (no model download), so the vector side is no better than chance here: the hit rate
+# shows what the keyword side adds; latency and prompt tokens are what a real model would see.
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Project_03_PDF_RAG_Brain"))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding  # noqa: E402
+from ingestion import IncrementalFAISS  # noqa: E402
+from retrieval import CrossEncoderReranker, HybridRetriever, estimate_tokens  # noqa: E402
+
+
+def synthetic_chunks(n, seed=0):
+    """~900-character chunks of filler text, each mentioning one part number and one clause id."""
+    rng = random.Random(seed)
+    words = ["pressure", "valve", "assembly", "warranty", "supplier", "torque", "inspection",
+             "maintenance", "tolerance", "housing", "bearing", "seal", "shall", "within", "the"]
+    chunks, ids = [], []
+    for i in range(n):
+        part, clause = f"X-{1000 + i}-{'ABCDEFGH'[i % 8]}", f"{i % 40 + 1}.{i % 17 + 1}.{i}"
+        filler = " ".join(rng.choice(words) for _ in range(130))
+        chunks.append(f"{filler[:400]} Part {part} is covered by clause {clause}. {filler[400:]}")
+        ids.append((part, clause))
+    return chunks, ids
+
+
+def run(name, retriever, queries):
+    latencies, tokens, hits = [], [], 0
+    for question, expected in queries:
+        start = time.perf_counter()
+        documents = retriever.invoke(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+        tokens.append(estimate_tokens(question) + sum(estimate_tokens(d.page_content) for d in documents))
+        hits += any(expected in d.page_content for d in documents)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<34}{statistics.mean(latencies):>9.2f}{p95:>9.2f}{statistics.mean(tokens):>15.0f}"
+          f"{hits / len(queries):>10.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--rerank", action="store_true", help="also run the cross-encoder (downloads a model)")
+    args = parser.parse_args()
+
+    chunks, ids = synthetic_chunks(args.chunks)
+    embeddings = DeterministicFakeEmbedding(size=384)
+    start = time.perf_counter()
+    vectorstore = IncrementalFAISS.from_embeddings(
+        list(zip(chunks, embeddings.embed_documents(chunks))), embeddings,
+        metadatas=[{"page": i} for i in range(len(chunks))],
+    )
+    vectorstore.sparse_search("warm-up")  # builds the BM25 index (done during ingestion in the app)
+    print(f"{args.chunks} chunks indexed in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(1)
+    queries = []
+    for i in rng.sample(range(args.chunks), args.queries):
+        part, clause = ids[i]
+        queries += [(f"Which clause covers part {part}?", part), (f"What does clause {clause} say?", clause)]
+
+    print(f"{'retriever':<34}{'mean ms':>9}{'p95 ms':>9}{'prompt tokens':>15}{'hit rate':>10}")
+    run("as_retriever() (previous)", vectorstore.as_retriever(), queries)
+    run("hybrid RRF, k=4", HybridRetriever(vectorstore=vectorstore, token_budget=None), queries)
+    run("hybrid RRF, 600-token budget", HybridRetriever(vectorstore=vectorstore, token_budget=600), queries)
+    if args.rerank:
+        reranker = CrossEncoderReranker()
+        run("hybrid + cross-encoder, 600 tok", HybridRetriever(vectorstore=vectorstore, reranker=reranker,
+                                                               token_budget=600), queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# ==========================================
+# 🔌 LLM client per turn vs shared pooled client
+# ==========================================
+# Run from Part_II_Practical_Implementation: `python benchmarks/bench_llm_clients.py`
+# Talks to a local stand-in for the Groq chat completions API, so no key or network is needed.
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from groq import Groq
+from llm_clients import FakeLLM, get_llm
+
+MESSAGES = [{"role": "user", "content": "What is an AI agent?"}]
+
+
+class StubGroq(BaseHTTPRequestHandler):
+    """Answers every POST with a fixed chat completion; counts TCP connections."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+    body = json.dumps({
+        "id": "chatcmpl-local", "object": "chat.completion", "created": 0, "model": "stub",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": "An agent perceives, reasons and acts."}}],
+    }).encode()
+
+    def setup(self):
+        super().setup()
+        StubGroq.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def per_turn(base_url):
+    """What the apps did before: a new client for every message."""
+    client = Groq(api_key="local", base_url=base_url)
+    completion = client.chat.completions.create(model="stub", messages=MESSAGES)
+    return completion.choices[0].message.content
+
+
+def shared(base_url):
+    return get_llm("local", backend="groq", base_url=base_url).complete(MESSAGES, model="stub")
+
+
+def measure(name, turn, n):
+    StubGroq.connections = 0
+    start = time.perf_counter()
+    for _ in range(n):
+        turn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28}{elapsed / n * 1000:>12.2f}{StubGroq.connections:>14}")
+
+
+async def fake_load(n, concurrency):
+    llm = FakeLLM(latency=0.05, token_delay=0.001)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return [token async for token in llm.astream(MESSAGES)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=300)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGroq)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{args.turns} chat turns against a local stub API")
+    print(f"{'client':<28}{'ms / turn':>12}{'connections':>14}")
+    measure("new Groq() per turn", lambda: per_turn(base_url), args.turns)
+    measure("shared get_llm()", lambda: shared(base_url), args.turns)
+    rate = asyncio.run(fake_load(1000, concurrency=100))
+    print(f"\nFakeLLM astream, 1000 requests at concurrency 100: {rate:.0f} req/s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
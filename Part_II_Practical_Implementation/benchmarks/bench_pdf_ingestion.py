@@ -0,0 +1,137 @@
+# ==========================================
+# 📊 Project 03: sequential PDF ingestion vs the streaming pipeline
+# ==========================================
+# Run from Part_II_Practical_Implementation: `python benchmarks/bench_pdf_ingestion.py --pages 2000`
+# Each ingestion runs in a fresh subprocess so its peak RSS can be measured on its own.
+# Embeddings are fake (no model download); --embed-ms adds the per-chunk cost of a real model.
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, "Project_03_PDF_RAG_Brain")
+
+SETUP = """
+import time
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+class SlowFakeEmbedding(DeterministicFakeEmbedding):
+    def embed_documents(self, texts):
+        time.sleep(EMBED_MS * len(texts) / 1000)  # a model releases the GIL while it computes
+        return super().embed_documents(texts)
+
+embeddings = SlowFakeEmbedding(size=384)
+"""
+
+INGESTIONS = {
+    "PyPDFLoader + FAISS (previous)": """
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_community.vectorstores import FAISS
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+chunks = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_documents(PyPDFLoader(PATH).load())
+first_result = None
+vectorstore = FAISS.from_documents(chunks, embeddings)
+""",
+    "ingest_pdf pipeline": """
+from ingestion import EmbeddingCache, ingest_pdf
+cache = EmbeddingCache(embeddings, path=CACHE)
+first_result = None
+for progress in ingest_pdf(open(PATH, "rb").read(), cache):
+    if first_result is None:
+        first_result = time.perf_counter() - start
+vectorstore = progress["vectorstore"]
+""",
+}
+
+
+def write_synthetic_pdf(path, pages, lines_per_page=60, seed=0):
+    """A minimal uncompressed PDF with text pages (Helvetica), written object by object."""
+    rng = random.Random(seed)
+    words = [f"{w}{i}" for i in range(500) for w in ("alpha", "beta", "gamma", "delta")]
+    offsets = []
+
+    with open(path, "wb") as f:
+        def add(number, body):
+            offsets.append((number, f.tell()))
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        # 1: catalog, 2: page tree, 3: font, then a (content, page) pair per page
+        add(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for page in range(pages):
+            lines = [" ".join(rng.choice(words) for _ in range(12)) for _ in range(lines_per_page)]
+            text = b" ".join(b"(" + line.encode() + b") '" for line in lines)
+            stream = b"BT /F1 8 Tf 30 820 Td 10 TL " + text + b" ET"
+            add(4 + 2 * page, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            add(5 + 2 * page, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                              b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (4 + 2 * page))
+        kids = b" ".join(b"%d 0 R" % (5 + 2 * page) for page in range(pages))
+        add(2, b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages)
+        add(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref = f.tell()
+        size = 4 + 2 * pages
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        table = dict(offsets)
+        f.write(b"".join(b"%010d 00000 n \n" % table[number] for number in range(1, size)))
+        f.write(b"trailer << /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+
+
+def run_ingestion(code, path, cache_path, embed_ms):
+    script = f"""
+import resource, sys, time
+sys.path.insert(0, {PROJECT!r}); sys.path.insert(0, {ROOT!r})
+PATH, CACHE, EMBED_MS = {path!r}, {cache_path!r}, {embed_ms!r}
+{SETUP}
+if __name__ == "__main__":
+    start = time.perf_counter()
+{_indent(code)}
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    workers_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(seconds, first_result or seconds, peak, workers_peak, vectorstore.index.ntotal)
+"""
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(script)  # a file, not -c: the pipeline's spawned workers re-import __main__
+    try:
+        out = subprocess.run([sys.executable, f.name], capture_output=True, text=True)
+    finally:
+        os.remove(f.name)
+    if out.returncode != 0:
+        print(out.stderr[-2000:], file=sys.stderr)
+        return None
+    return [float(x) for x in out.stdout.split()]
+
+
+def _indent(code):
+    return "\n".join("    " + line for line in code.strip().splitlines())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--embed-ms", type=float, default=1.0, help="simulated model time per chunk")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.pdf")
+        write_synthetic_pdf(path, args.pages)
+        print(f"{args.pages} pages, {os.path.getsize(path) / 1e6:.1f} MB PDF, {args.embed_ms:g} ms/chunk embedding")
+        print(f"{'ingestion':<32}{'seconds':>9}{'pages/s':>9}{'first query':>13}{'peak RSS MB':>13}"
+              f"{'worker MB':>11}{'chunks':>8}")
+        for name, code in INGESTIONS.items():
+            result = run_ingestion(code, path, os.path.join(tmp, f"cache-{time.time_ns()}.sqlite"), args.embed_ms)
+            if result is None:
+                print(f"{name:<32}{'failed':>9}")
+                continue
+            seconds, first, peak_mb, worker_mb, chunks = result
+            print(f"{name:<32}{seconds:>9.1f}{args.pages / seconds:>9.0f}{first:>12.1f}s{peak_mb:>13.0f}"
+                  f"{worker_mb:>11.0f}{chunks:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
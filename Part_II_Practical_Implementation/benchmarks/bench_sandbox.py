@@ -0,0 +1,104 @@
+# ==========================================
+# 🧪 Project 02: in-process exec vs SandboxPool workers
+# ==========================================
+# Run from Part_II_Practical_Implementation: `python benchmarks/bench_sandbox.py`
+import argparse
+import io
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Project_02_CSV_Data_Analyst"))
+from data_loader import load_csv
+from sandbox import SandboxPool
+
+QUERIES = {
+    "scalar": "result = df['price'].mean()",
+    "groupby": "result = df.groupby('region')['price'].sum()",
+    "top rows": "result = df.sort_values('price', ascending=False).head(100)",
+}
+
+
+def in_process(df, code):
+    local_vars = {"df": df.copy(deep=False), "pd": pd}
+    exec(code, {}, local_vars)
+    return local_vars["result"]
+
+
+def worker_memory_mb(pid):
+    """(private, file-backed) resident MB of a process: copies vs pages shared through the mapped file."""
+    fields = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                fields[line.split(":")[0]] = int(line.split()[1]) / 1024
+    return fields["RssAnon"], fields["RssFile"]
+
+
+def median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    csv = pd.DataFrame({
+        "order_id": np.arange(args.rows),
+        "price": rng.uniform(1, 500, args.rows).round(2),
+        "region": rng.choice(["north", "south", "east", "west"], args.rows),
+    }).to_csv(index=False).encode()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        df, info = load_csv(io.BytesIO(csv), cache_dir=tmp)
+        start = time.perf_counter()
+        pool = SandboxPool(info["cache_path"], workers=2, timeout=2, memory_mb=512)
+        pool.run("result = 1")
+        pool.run("result = 1")
+        print(f"{args.rows:,} rows ({df.memory_usage(deep=True).sum() / 1e6:.0f} MB as a DataFrame); "
+              f"2 workers ready in {time.perf_counter() - start:.1f}s")
+        for process in multiprocessing.active_children():
+            private, shared = worker_memory_mb(process.pid)
+            print(f"  worker {process.pid}: {private:.0f} MB private (interpreter + its copy of numeric columns), "
+                  f"{shared:.0f} MB file-backed (libraries + mapped strings)")
+        print()
+
+        print(f"{'query':<12}{'in-process ms':>15}{'sandbox ms':>12}{'overhead ms':>13}")
+        for name, code in QUERIES.items():
+            local = median_ms(lambda: in_process(df, code), args.repeats)
+            remote = median_ms(lambda: pool.run(code), args.repeats)
+            print(f"{name:<12}{local:>15.2f}{remote:>12.2f}{remote - local:>13.2f}")
+
+        print("\nrunaway and oversized snippets:")
+        for name, code in {
+            "infinite loop": "while True: pass",
+            "cross join": "result = df.merge(df, how='cross')",
+        }.items():
+            start = time.perf_counter()
+            ok, message = pool.run(code)
+            print(f"  {name:<14} -> {message[:60]!r} after {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        ok, value = pool.run(QUERIES["scalar"])
+        print(f"  next query     -> {value:.2f} after {time.perf_counter() - start:.1f}s (replacement worker)")
+        print(f"\npool stats: {pool.stats}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
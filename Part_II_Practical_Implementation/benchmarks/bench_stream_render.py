@@ -0,0 +1,75 @@
+# ==========================================
+# 🖋️ Project 01: per-token re-render vs StreamRenderer
+# ==========================================
+# Run from Part_II_Practical_Implementation: `python benchmarks/bench_stream_render.py`
+# Streams 5k fake tokens; `render` stands in for st.markdown, which serializes
+# the whole text and ships it to the browser on every call.
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Project_01_Simple_Chat_LLM"))
+from llm_clients import FakeLLM
+from stream_renderer import StreamRenderer
+
+MESSAGES = [{"role": "user", "content": "Explain context windows in detail."}]
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.updates = 0
+        self.bytes_sent = 0
+
+    def markdown(self, text):
+        self.updates += 1
+        self.bytes_sent += len(json.dumps({"markdown": {"body": text}}).encode())
+
+
+def per_token(stream, placeholder):
+    """The previous loop in app.py."""
+    full_response = ""
+    for token in stream:
+        full_response += token
+        placeholder.markdown(full_response + "▌")
+    placeholder.markdown(full_response)
+    return full_response
+
+
+def throttled(stream, placeholder, max_fps):
+    renderer = StreamRenderer(placeholder.markdown, max_fps=max_fps)
+    for token in stream:
+        renderer.add(token)
+    return renderer.finish()
+
+
+def run(name, loop, llm):
+    placeholder = FakePlaceholder()
+    wall, cpu = time.perf_counter(), time.process_time()
+    text = loop(llm.stream(MESSAGES), placeholder)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"{name:<24}{placeholder.updates:>10}{placeholder.bytes_sent / 1e6:>12.1f}{cpu:>10.2f}{wall:>10.2f}")
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--tokens-per-second", type=float, default=1000)
+    parser.add_argument("--fps", type=float, default=15)
+    args = parser.parse_args()
+
+    reply = " ".join(f"word{i % 97}" for i in range(args.tokens))
+    llm = FakeLLM(latency=0, token_delay=1 / args.tokens_per_second, reply=reply)
+    print(f"{args.tokens} tokens at {args.tokens_per_second:.0f} tokens/s")
+    print(f"{'loop':<24}{'UI updates':>10}{'MB sent':>12}{'CPU s':>10}{'wall s':>10}")
+    before = run("per-token render", per_token, llm)
+    after = run(f"StreamRenderer {args.fps:.0f} fps", lambda s, p: throttled(s, p, args.fps), llm)
+    assert before == after
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# ==========================================
+# 🔌 Shared LLM Clients for the Part II Projects
+# ==========================================
+# Every project gets its LLM from here instead of building a new client on
+# each message or Streamlit rerun. Clients are created once per process and
+# per (backend, api key), and keep their HTTP connections alive between turns.
+#
+# Set LLM_BACKEND=fake to run any app or load test offline: answers are
+# simulated locally and any non-empty API key is accepted.
+#
+# Usage from a project folder:
+#     sys.path.append(str(Path(__file__).resolve().parents[1]))
+#     from llm_clients import get_llm, get_chat_model
+import asyncio
+import os
+import threading
+import time
+import weakref
+
+import httpx
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60)
+TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+_llms = {}
+_chat_models = {}
+_lock = threading.Lock()
+
+
+def _backend(backend=None):
+    return backend or os.environ.get("LLM_BACKEND", "groq")
+
+
+class GroqLLM:
+    """Chat completions (sync, async and streaming) over pooled Groq clients."""
+    def __init__(self, api_key, base_url=None):
+        from groq import Groq
+
+        self.api_key = api_key
+        self.base_url = base_url
+        self.client = Groq(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=httpx.Client(limits=POOL_LIMITS, timeout=TIMEOUT),
+        )
+        # httpx async clients are bound to the event loop that uses them.
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def _async_client(self):
+        from groq import AsyncGroq
+
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = AsyncGroq(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=httpx.AsyncClient(limits=POOL_LIMITS, timeout=TIMEOUT),
+            )
+        return client
+
+    def complete(self, messages, model=DEFAULT_MODEL, **kwargs):
+        completion = self.client.chat.completions.create(model=model, messages=messages, **kwargs)
+        return completion.choices[0].message.content
+
+    def stream(self, messages, model=DEFAULT_MODEL, **kwargs):
+        """Yields the reply's text chunks as they arrive."""
+        chunks = self.client.chat.completions.create(model=model, messages=messages, stream=True, **kwargs)
+        for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content is not None:
+                yield chunk.choices[0].delta.content
+
+    async def acomplete(self, messages, model=DEFAULT_MODEL, **kwargs):
+        completion = await self._async_client().chat.completions.create(model=model, messages=messages, **kwargs)
+        return completion.choices[0].message.content
+
+    async def astream(self, messages, model=DEFAULT_MODEL, **kwargs):
+        chunks = await self._async_client().chat.completions.create(
+            model=model, messages=messages, stream=True, **kwargs
+        )
+        async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content is not None:
+                yield chunk.choices[0].delta.content
+
+
+class FakeLLM:
+    """Offline stand-in with the same interface as GroqLLM.
+
+    Waits `latency` seconds (time to first token), then produces the reply
+    one word every `token_delay` seconds. `reply` is a string or a function
+    of the messages; by default the last message is echoed back.
+    """
+    def __init__(self, latency=None, token_delay=None, reply=None):
+        self.latency = float(os.environ.get("FAKE_LLM_LATENCY", "0.2")) if latency is None else latency
+        self.token_delay = float(os.environ.get("FAKE_LLM_TOKEN_DELAY", "0.02")) if token_delay is None else token_delay
+        self.reply = reply
+        self.calls = 0
+
+    def _tokens(self, messages):
+        self.calls += 1
+        if callable(self.reply):
+            text = self.reply(messages)
+        elif self.reply is not None:
+            text = self.reply
+        else:
+            text = f"(fake reply) You said: {messages[-1]['content']}"
+        words = text.split(" ")
+        return [words[0]] + [" " + word for word in words[1:]]
+
+    def complete(self, messages, model=DEFAULT_MODEL, **kwargs):
+        tokens = self._tokens(messages)
+        time.sleep(self.latency + self.token_delay * len(tokens))
+        return "".join(tokens)
+
+    def stream(self, messages, model=DEFAULT_MODEL, **kwargs):
+        tokens = self._tokens(messages)
+        time.sleep(self.latency)
+        for token in tokens:
+            time.sleep(self.token_delay)
+            yield token
+
+    async def acomplete(self, messages, model=DEFAULT_MODEL, **kwargs):
+        tokens = self._tokens(messages)
+        await asyncio.sleep(self.latency + self.token_delay * len(tokens))
+        return "".join(tokens)
+
+    async def astream(self, messages, model=DEFAULT_MODEL, **kwargs):
+        tokens = self._tokens(messages)
+        await asyncio.sleep(self.latency)
+        for token in tokens:
+            await asyncio.sleep(self.token_delay)
+            yield token
+
+
+def get_llm(api_key=None, backend=None, base_url=None):
+    """The process-wide LLM client for this backend and key (created on first use)."""
+    backend = _backend(backend)
+    key = (backend, api_key, base_url)
+    with _lock:
+        llm = _llms.get(key)
+        if llm is None:
+            if backend == "fake":
+                llm = FakeLLM()
+            elif backend == "groq":
+                llm = GroqLLM(api_key, base_url=base_url)
+            else:
+                raise ValueError(f"Unknown LLM backend: {backend!r} (expected 'groq' or 'fake')")
+            _llms[key] = llm
+    return llm
+
+
+def get_chat_model(api_key, model_name=DEFAULT_MODEL, temperature=0, backend=None):
+    """A shared LangChain chat model, so Streamlit reruns do not rebuild ChatGroq.
+
+    The fake backend returns a FakeListChatModel, which covers plain chains
+    but not tool-calling agents.
+    """
+    backend = _backend(backend)
+    key = (backend, api_key, model_name, temperature)
+    with _lock:
+        model = _chat_models.get(key)
+        if model is None:
+            if backend == "fake":
+                from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+                model = FakeListChatModel(responses=["(fake reply)"])
+            elif backend == "groq":
+                from langchain_groq import ChatGroq
+
+                model = ChatGroq(groq_api_key=api_key, model_name=model_name, temperature=temperature)
+            else:
+                raise ValueError(f"Unknown LLM backend: {backend!r} (expected 'groq' or 'fake')")
+            _chat_models[key] = model
+    return model